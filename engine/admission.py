@@ -0,0 +1,451 @@
+"""
+ProductiveMiner Admission Control
+Predicts wall time and peak memory of a computation from its work type,
+difficulty and workload parameters, and admits it only while the engine
+has budget for it. Each work type starts from the computation_complexity
+and difficulty_range declared in engine_config.json, scaled by how much
+more work its parameters ask for than the defaults, and its cost model is
+refined online from the runtimes and memory peaks actually observed.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from prime_store import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may wait for capacity before it is turned away with 429
+ADMISSION_WAIT = float(os.getenv('ADMISSION_WAIT', 2.0))
+# Observations a cost model needs before its predictions can reject a request
+ADMISSION_MIN_OBSERVATIONS = int(os.getenv('ADMISSION_MIN_OBSERVATIONS', 5))
+COST_MODEL_PATH = os.getenv('COST_MODEL_PATH', os.path.join(DATA_DIR, 'cost_model.json'))
+
+# engine_config.json names its mathematical types differently from the API work types
+CONFIG_TYPES = {
+   "prime-pattern-discovery": "prime_pattern",
+   "riemann-zeros": "riemann_zero",
+   "yang-mills-theory": "yang_mills",
+   "goldbach-conjecture": "goldbach",
+   "navier-stokes": "navier_stokes",
+   "birch-swinnerton": "birch_swinnerton",
+   "elliptic-curve-crypto": "ecc",
+   "lattice-cryptography": "lattice",
+   "poincaré-conjecture": "poincare"
+}
+
+# Prior: the top of a work type's difficulty range takes this share of max_computation_time
+PRIOR_TIME_SHARE = 0.25
+PRIOR_MEMORY_MB = 64.0
+# Priors are guesses, so they reject only predictions this many times over the limits
+PRIOR_REJECT_FACTOR = 4.0
+# Range modes cover range_end - range_start whatever the difficulty; prior numbers covered per second,
+# a quarter of what one core measured
+RANGE_RATES = {
+   "goldbach-conjecture": 2.5e6,
+   "collatz-conjecture": 2.5e6,
+   "twin-primes": 5e7
+}
+# Range modes whose seeds are fixed-width integers: range_start and range_end must satisfy lo <= start < end < hi
+RANGE_BOUNDS = {
+   "collatz-conjecture": (1, 1 << 64)
+}
+# Observation noise and forgetting factor of the online fit, in log space
+_NOISE = 0.25
+_FORGETTING = 0.98
+
+def _number(parameters: Dict[str, Any], name: str, default: float) -> float:
+   try:
+       return float(parameters.get(name, default))
+   except (TypeError, ValueError):
+       return default
+
+def _span(d: int, parameters: Dict[str, Any]) -> float:
+   """Numbers covered by a range mode; the models of range modes are keyed on range_end"""
+   if "range_end" not in parameters:
+       return 1.0
+   return _number(parameters, "range_end", 0) - _number(parameters, "range_start", 0)
+
+def _riemann_scale(d: int, parameters: Dict[str, Any]) -> float:
+   # Each zero costs a Riemann-Siegel sum of about sqrt(t) terms
+   t0, count0 = 10.0 ** (1 + d / 20), 10.0 * d
+   return _number(parameters, "count", count0) / count0 * math.sqrt(max(_number(parameters, "t_start", t0), 1.0) / t0)
+
+def _mersenne_scale(d: int, parameters: Dict[str, Any]) -> float:
+   if "exponents" in parameters:
+       try:
+           end = max(float(p) for p in parameters["exponents"])
+       except (TypeError, ValueError):
+           return 1.0
+   else:
+       end = _number(parameters, "exponent_end", d * 50)
+   # About end / log end exponents, each a Lucas-Lehmer test of end squarings of end bits
+   return (end / (d * 50)) ** 3
+
+def _navier_stokes_scale(d: int, parameters: Dict[str, Any]) -> float:
+   dimensions = 3 if _number(parameters, "dimensions", 2) == 3 else 2
+   n0 = (32 if dimensions == 2 else 16) << (d // 25)
+   return (_number(parameters, "grid", n0) / n0) ** dimensions * _number(parameters, "steps", 4 * d) / (4 * d)
+
+def _yang_mills_scale(d: int, parameters: Dict[str, Any]) -> float:
+   size0 = 4 + 2 * (d // 25)
+   updates = _number(parameters, "sweeps", 20) * (1 + _number(parameters, "overrelaxation", 2)) / 60
+   return (_number(parameters, "lattice_size", size0) / size0) ** 4 * updates
+
+def _elliptic_curve_scale(d: int, parameters: Dict[str, Any]) -> float:
+   multiplications = _number(parameters, "multiplications", d * 20) / (d * 20)
+   # Baby-step giant-step point counting takes about p^(1/4) steps per curve
+   counting = 2 ** ((_number(parameters, "count_bits", 16 + d // 2) - 16 - d // 2) / 4) * _number(parameters, "curves", 4) / 4
+   return max(multiplications, counting)
+
+# Parameters that set the size of a work type's workload, and that workload
+# relative to the handler's defaults at a difficulty (1 when none is given),
+# or for range modes the span covered. Model keys only ever name these
+# parameters, so clients cannot add models.
+WORKLOADS: Dict[str, Tuple[Tuple[str, ...], Callable[[int, Dict[str, Any]], float]]] = {
+   "goldbach-conjecture": (("range_start", "range_end", "count_representations"), _span),
+   "twin-primes": (("range_start", "range_end", "census"), _span),
+   "collatz-conjecture": (("range_start", "range_end"), _span),
+   "riemann-zeros": (("t_start", "count"), _riemann_scale),
+   "mersenne-primes": (("exponent_start", "exponent_end", "exponents"), _mersenne_scale),
+   "perfect-numbers": (("exponent_start", "exponent_end", "exponents"), _mersenne_scale),
+   "fibonacci-patterns": (("n", "modulus"), lambda d, p: max(_number(p, "modulus", 10) / 10, 1.0)),
+   "pascal-triangle": (("rows", "prime"), lambda d, p: (_number(p, "rows", d * 10) / (d * 10)) ** 2),
+   "number-theory": (("factor_start", "factor_count"), lambda d, p: _number(p, "factor_count", 10 * d) / (10 * d)),
+   "yang-mills-theory": (("group", "lattice_size", "sweeps", "overrelaxation"), _yang_mills_scale),
+   "navier-stokes": (("dimensions", "grid", "steps"), _navier_stokes_scale),
+   "elliptic-curve-crypto": (("curve", "multiplications", "count_bits", "curves"), _elliptic_curve_scale),
+   # LLL takes about d^3 swaps and size reductions of d-vectors; BKZ adds a few tours on top
+   "lattice-cryptography": (("dimension", "kind", "modulus", "bkz_block_size"),
+                            lambda d, p: (_number(p, "dimension", d * 10) / (d * 10)) ** 3 * (3 if _number(p, "bkz_block_size", 0) else 1))
+}
+
+def workload_scale(work_type: str, difficulty: int, parameters: Dict[str, Any]) -> float:
+   """How many times the default workload of a difficulty level the parameters ask for"""
+   names, scale = WORKLOADS.get(work_type, ((), None))
+   if scale is None or not any(name in parameters for name in names):
+       return 1.0
+   try:
+       return max(float(scale(max(difficulty, 1), parameters)), 1e-6)
+   except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+       return 1.0
+
+class OverBudget(Exception):
+   """The predicted cost of a single computation exceeds the engine's limits"""
+
+class InvalidParameters(OverBudget):
+   """Parameters no computation of the work type can run with, whatever its budget"""
+
+def check_range(work_type: str, parameters: Dict[str, Any]) -> None:
+   """Raise InvalidParameters for a range mode outside the integers its handler works in"""
+   if work_type not in RANGE_BOUNDS or "range_end" not in parameters:
+       return
+   lo, hi = RANGE_BOUNDS[work_type]
+   try:
+       start, end = int(parameters.get("range_start", lo)), int(parameters["range_end"])
+   except (TypeError, ValueError, OverflowError):
+       raise InvalidParameters(f"{work_type} needs integer range_start and range_end")
+   if not lo <= start < end < hi:
+       raise InvalidParameters(f"{work_type} needs {lo} <= range_start < range_end < {hi}, "
+                               f"not [{start}, {end})")
+
+class Overloaded(Exception):
+   """No capacity is free right now; retry after the given number of seconds"""
+
+   def __init__(self, message: str, retry_after: float):
+       super().__init__(message)
+       self.retry_after = retry_after
+
+def parse_complexity(complexity: str) -> Tuple[float, float, float]:
+   """Powers (a, b, c) in O(n^a (log n)^b (log log n)^c), e.g. "O(n log log n)" -> (1, 0, 1)"""
+   text = complexity.replace(" ", "")
+   match = re.search(r"n\^([\d.]+)", text)
+   a = float(match.group(1)) if match else (1.0 if re.search(r"\(n", text) else 0.0)
+   loglog = text.count("loglogn")
+   log = text.count("logn") - loglog
+   return a, float(log), float(loglog)
+
+class LogLinearModel:
+   """log y = theta0 + theta1 * log n + theta2 * log scale + fixed log terms, fitted by recursive least squares
+
+   n is the difficulty and scale the workload relative to that difficulty's default.
+   """
+
+   def __init__(self, intercept: float, slope: float, log_power: float = 0.0, loglog_power: float = 0.0,
+                scale_slope: float = 1.0):
+       self.theta = np.array([intercept, slope, scale_slope])
+       self.covariance = np.diag([4.0, 0.25, 0.25])
+       self.log_power = log_power
+       self.loglog_power = loglog_power
+       self.observations = 0
+
+   def _features(self, n: float, scale: float) -> Tuple[np.ndarray, float]:
+       log_n = math.log(max(n, 3.0))
+       offset = self.log_power * math.log(log_n) + self.loglog_power * math.log(max(math.log(log_n), 1e-3))
+       return np.array([1.0, log_n, math.log(scale)]), offset
+
+   def predict(self, n: float, scale: float = 1.0) -> float:
+       phi, offset = self._features(n, scale)
+       return math.exp(min(float(phi @ self.theta) + offset, 700.0))
+
+   def update(self, n: float, observed: float, scale: float = 1.0) -> None:
+       phi, offset = self._features(n, scale)
+       target = math.log(max(observed, 1e-6)) - offset
+       self.covariance /= _FORGETTING
+       gain = self.covariance @ phi / (phi @ self.covariance @ phi + _NOISE)
+       self.theta = self.theta + gain * (target - phi @ self.theta)
+       self.covariance = self.covariance - np.outer(gain, phi @ self.covariance)
+       self.observations += 1
+
+   def to_dict(self) -> Dict[str, Any]:
+       return {"theta": self.theta.tolist(), "covariance": self.covariance.tolist(), "observations": self.observations}
+
+   def load(self, state: Dict[str, Any]) -> None:
+       theta = np.array(state["theta"], dtype=float)
+       if theta.shape != self.theta.shape:
+           # Saved before the model had a workload term; start over from the prior
+           return
+       self.theta = theta
+       self.covariance = np.array(state["covariance"], dtype=float)
+       self.observations = int(state["observations"])
+
+class Ticket:
+   """An admitted computation; observe() records its measured cost for the model"""
+
+   def __init__(self, key: str, difficulty: int, seconds: float, memory_mb: float, scale: float = 1.0):
+       self.key = key
+       self.difficulty = difficulty
+       self.scale = scale
+       self.seconds = seconds
+       self.memory_mb = memory_mb
+       self.started = time.time()
+       self.observed_seconds: Optional[float] = None
+       self.observed_mb: Optional[float] = None
+
+   def observe(self, seconds: Optional[float], memory_mb: Optional[float] = None) -> None:
+       self.observed_seconds = seconds
+       self.observed_mb = memory_mb
+
+class AdmissionController:
+   """Cost models per (work type, workload parameter names) plus memory and concurrency budgets"""
+
+   def __init__(self, engine_config: Dict[str, Any], max_seconds: float, memory_limit_mb: float,
+                max_concurrent: int, path: Optional[str] = COST_MODEL_PATH):
+       self.types = engine_config.get('mathematical_types', {})
+       settings = engine_config.get('computation_settings', {})
+       self.min_difficulty = int(settings.get('min_difficulty', 1))
+       self.max_difficulty = int(settings.get('max_difficulty', 100))
+       self.max_seconds = max_seconds
+       self.memory_limit_mb = memory_limit_mb
+       self.max_concurrent = max(1, max_concurrent)
+       self.path = path
+       self.time_models: Dict[str, LogLinearModel] = {}
+       self.memory_models: Dict[str, LogLinearModel] = {}
+       self.running: Dict[int, Ticket] = {}
+       self._changed: Optional[asyncio.Condition] = None
+       self.admitted = 0
+       self.rejected = 0
+       self.throttled = 0
+       self.load()
+
+   @staticmethod
+   def model_key(work_type: str, parameters: Dict[str, Any]) -> str:
+       """Parameters such as range_end switch a handler's mode, so each set of workload parameters gets its own model"""
+       names = WORKLOADS.get(work_type, ((), None))[0]
+       return "|".join([work_type] + sorted(name for name in parameters if name in names))
+
+   def _models(self, work_type: str, parameters: Dict[str, Any]) -> Tuple[str, LogLinearModel, LogLinearModel]:
+       key = self.model_key(work_type, parameters)
+       if key not in self.time_models and work_type in RANGE_RATES and "range_end" in parameters:
+           # Linear in the span, independent of difficulty; sieves and lanes run in fixed-size chunks
+           self.time_models[key] = LogLinearModel(-math.log(RANGE_RATES[work_type]), 0.0)
+           self.memory_models[key] = LogLinearModel(math.log(PRIOR_MEMORY_MB), 0.0, scale_slope=0.0)
+       if key not in self.time_models:
+           declared = self.types.get(CONFIG_TYPES.get(work_type, ""), {})
+           a, b, c = parse_complexity(declared.get("computation_complexity", "O(n)"))
+           top = float(declared.get("difficulty_range", [1, self.max_difficulty])[1])
+           # Anchor the prior so the top of the difficulty range costs a fixed share of the time budget
+           time_model = LogLinearModel(0.0, a, b, c)
+           time_model.theta[0] = math.log(PRIOR_TIME_SHARE * self.max_seconds / time_model.predict(top))
+           self.time_models[key] = time_model
+           self.memory_models[key] = LogLinearModel(math.log(PRIOR_MEMORY_MB), 0.0, scale_slope=0.5)
+       return key, self.time_models[key], self.memory_models[key]
+
+   def estimate(self, work_type: str, difficulty: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
+       key, time_model, memory_model = self._models(work_type, parameters)
+       scale = workload_scale(work_type, difficulty, parameters)
+       return {
+           "model": key,
+           "workload_scale": scale,
+           "seconds": time_model.predict(difficulty, scale),
+           "memory_mb": memory_model.predict(difficulty, scale),
+           "observations": time_model.observations,
+           "confident": time_model.observations >= ADMISSION_MIN_OBSERVATIONS
+       }
+
+   def check(self, work_type: str, difficulty: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
+       """Estimate a computation, raising OverBudget if it can never fit"""
+       if not self.min_difficulty <= difficulty <= self.max_difficulty:
+           self.rejected += 1
+           raise OverBudget(f"Difficulty {difficulty} is outside [{self.min_difficulty}, {self.max_difficulty}]")
+       try:
+           check_range(work_type, parameters)
+       except InvalidParameters:
+           self.rejected += 1
+           raise
+       estimate = self.estimate(work_type, difficulty, parameters)
+       # Priors are guesses; they reject only what is far over the limits, fitted models anything over
+       margin = 1.0 if estimate["confident"] else PRIOR_REJECT_FACTOR
+       if estimate["seconds"] > margin * self.max_seconds:
+           self.rejected += 1
+           raise OverBudget(f"{work_type} at difficulty {difficulty} is predicted to take "
+                            f"{estimate['seconds']:.0f}s, over the {self.max_seconds:.0f}s limit")
+       if estimate["memory_mb"] > margin * self.memory_limit_mb:
+           self.rejected += 1
+           raise OverBudget(f"{work_type} at difficulty {difficulty} is predicted to need "
+                            f"{estimate['memory_mb']:.0f}MB, over the {self.memory_limit_mb:.0f}MB limit")
+       return estimate
+
+   def _fits(self, memory_mb: float) -> bool:
+       in_use = sum(t.memory_mb for t in self.running.values())
+       return len(self.running) < self.max_concurrent and (not self.running or in_use + memory_mb <= self.memory_limit_mb)
+
+   def retry_after(self) -> float:
+       """Seconds until the running computation predicted to finish first is done"""
+       now = time.time()
+       remaining = [t.started + t.seconds - now for t in self.running.values()]
+       return max(1.0, min(remaining, default=1.0))
+
+   @asynccontextmanager
+   async def admit(self, work_type: str, difficulty: int, parameters: Dict[str, Any],
+                   wait: Optional[float] = ADMISSION_WAIT) -> AsyncIterator[Ticket]:
+       """Hold budget for one computation, then learn from its cost.
+
+       Waits up to `wait` seconds for capacity (indefinitely if None) before
+       raising Overloaded.
+       """
+       estimate = self.check(work_type, difficulty, parameters)
+       ticket = Ticket(estimate["model"], difficulty, estimate["seconds"], estimate["memory_mb"], estimate["workload_scale"])
+       async with self._hold(ticket, wait):
+           yield ticket
+
+   @asynccontextmanager
+   async def admit_batch(self, jobs: List[Tuple[str, int, Dict[str, Any]]],
+                         wait: Optional[float] = ADMISSION_WAIT) -> AsyncIterator[Ticket]:
+       """Hold budget for (work_type, difficulty, parameters) jobs run one after another in one worker.
+
+       The slot is sized by their summed time and largest memory. The jobs
+       were checked one by one already, and learn through record() rather
+       than the ticket.
+       """
+       estimates = [self.estimate(*job) for job in jobs]
+       ticket = Ticket("", 0, sum(e["seconds"] for e in estimates), max(e["memory_mb"] for e in estimates))
+       async with self._hold(ticket, wait):
+           yield ticket
+
+   @asynccontextmanager
+   async def _hold(self, ticket: Ticket, wait: Optional[float]) -> AsyncIterator[None]:
+       if self._changed is None:
+           self._changed = asyncio.Condition()
+       async with self._changed:
+           try:
+               await asyncio.wait_for(self._changed.wait_for(lambda: self._fits(ticket.memory_mb)), wait)
+           except asyncio.TimeoutError:
+               self.throttled += 1
+               raise Overloaded(f"Engine at capacity with {len(self.running)} computations running", self.retry_after())
+           ticket.started = time.time()
+           self.running[id(ticket)] = ticket
+           self.admitted += 1
+       try:
+           yield
+       finally:
+           async with self._changed:
+               del self.running[id(ticket)]
+               self._changed.notify_all()
+           self.observe(ticket)
+
+   def observe(self, ticket: Ticket) -> None:
+       if ticket.observed_seconds is not None:
+           self.time_models[ticket.key].update(ticket.difficulty, ticket.observed_seconds, ticket.scale)
+       if ticket.observed_mb is not None:
+           self.memory_models[ticket.key].update(ticket.difficulty, ticket.observed_mb, ticket.scale)
+
+   def record(self, work_type: str, difficulty: int, parameters: Dict[str, Any], seconds: float) -> None:
+       """Learn from a computation that ran outside admit(), e.g. inside a batch"""
+       key, time_model, _ = self._models(work_type, parameters)
+       time_model.update(difficulty, seconds, workload_scale(work_type, difficulty, parameters))
+
+   def load(self) -> None:
+       if not self.path:
+           return
+       try:
+           with open(self.path) as f:
+               state = json.load(f)
+       except (OSError, ValueError):
+           return
+       for key, models in state.items():
+           work_type = key.split("|")[0]
+           # Keys naming parameters outside the workload whitelist came from older versions and are dropped
+           if key != self.model_key(work_type, {name: None for name in key.split("|")[1:]}):
+               continue
+           _, time_model, memory_model = self._models(work_type, {name: None for name in key.split("|")[1:]})
+           time_model.load(models["time"])
+           memory_model.load(models["memory"])
+
+   def save(self) -> None:
+       if not self.path:
+           return
+       state = {key: {"time": self.time_models[key].to_dict(), "memory": self.memory_models[key].to_dict()}
+                for key in self.time_models}
+       try:
+           os.makedirs(os.path.dirname(self.path), exist_ok=True)
+           tmp_path = f'{self.path}.{os.getpid()}.tmp'
+           with open(tmp_path, 'w') as f:
+               json.dump(state, f)
+           os.replace(tmp_path, self.path)
+       except OSError as e:
+           logger.warning(f"Could not save cost model: {e}")
+
+   def stats(self) -> Dict[str, Any]:
+       return {
+           "running": len(self.running),
+           "max_concurrent": self.max_concurrent,
+           "memory_reserved_mb": sum(t.memory_mb for t in self.running.values()),
+           "memory_limit_mb": self.memory_limit_mb,
+           "admitted": self.admitted,
+           "rejected": self.rejected,
+           "throttled": self.throttled,
+           "models": len(self.time_models)
+       }
+
+def peak_memory_reset() -> Optional[float]:
+   """Reset the process's peak RSS counter (Linux) and return the current RSS in MB"""
+   try:
+       with open('/proc/self/clear_refs', 'w') as f:
+           f.write('5')
+       return _status_mb('VmRSS')
+   except OSError:
+       return None
+
+def peak_memory_mb() -> Optional[float]:
+   """Peak RSS in MB since the last peak_memory_reset()"""
+   try:
+       return _status_mb('VmHWM')
+   except OSError:
+       return None
+
+def _status_mb(field: str) -> Optional[float]:
+   with open('/proc/self/status') as f:
+       for line in f:
+           if line.startswith(field + ':'):
+               return int(line.split()[1]) / 1024
+   return None
@@ -2,10 +2,15 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import redis
 import psycopg2
-import numpy as np
 import json
 import os
 
+from arithmetic import is_prime  # shared primality test, still importable as app.is_prime
+from lattice_gauge import lattice_monte_carlo
+from result_cache import cache_key, canonical_json
+from riemann import MAX_ZERO_COUNT, MAX_ZERO_HEIGHT, MIN_ZERO_HEIGHT, find_zeros
+from sieve import primes_up_to
+
 app = Flask(__name__)
 CORS(app)
 
@@ -31,12 +36,17 @@ def compute():
         work_type = data.get('work_type')
         parameters = data.get('parameters', {})
         
-        # Mathematical computation based on work type
-        result = perform_computation(work_type, parameters)
-        
-        # Store result in Redis for caching
-        cache_key = f"compute:{work_type}:{hash(str(parameters))}"
-        redis_client.setex(cache_key, 3600, json.dumps(result))
+        # Canonical digest, stable across processes unlike hash()
+        key = f"compute:{cache_key(work_type, 0, parameters, 'app')}"
+        cached = redis_client.get(key)
+        if cached is not None:
+            result = json.loads(cached)
+        else:
+            # Mathematical computation based on work type
+            result = perform_computation(work_type, parameters)
+            
+            # Store result in Redis for caching
+            redis_client.setex(key, 3600, canonical_json(result))
         
         return jsonify({
             'status': 'success',
@@ -60,10 +70,8 @@ def perform_computation(work_type, parameters):
 def compute_prime_patterns(params):
     """Compute prime number patterns"""
     limit = params.get('limit', 1000)
-    primes = []
-    for i in range(2, limit):
-        if is_prime(i):
-            primes.append(i)
+    # Primes below limit from the bit-packed sieve, not a primality test per integer
+    primes = primes_up_to(limit - 1).tolist()
     return {
         'primes_found': len(primes),
         'largest_prime': max(primes) if primes else 0,
@@ -71,34 +79,30 @@ def compute_prime_patterns(params):
     }
 
 def compute_riemann_zeros(params):
-    """Compute Riemann zeta function zeros"""
-    # Simplified Riemann zero computation
-    zeros = []
-    for i in range(1, params.get('count', 10) + 1):
-        zeros.append(0.5 + 14.134725 * i)
+    """Compute Riemann zeta function zeros on the critical line"""
+    # Same bounds as the FastAPI engine: 10 <= t_start <= 1e12, at most MAX_ZERO_COUNT zeros
+    t_start = min(max(float(params.get('t_start', MIN_ZERO_HEIGHT)), MIN_ZERO_HEIGHT), MAX_ZERO_HEIGHT)
+    count = min(max(int(params.get('count', 10)), 1), MAX_ZERO_COUNT)
+    block = find_zeros(t_start, count)
     return {
-        'zeros_found': len(zeros),
-        'zeros': zeros[:5]  # Return first 5 for brevity
+        'zeros_found': len(block['zeros']),
+        'zeros': block['zeros'][:5],  # Return first 5 for brevity
+        'zeros_per_second': block['zeros_per_second']
     }
 
 def compute_yang_mills(params):
     """Compute Yang-Mills theory calculations"""
-    # Simplified Yang-Mills computation
+    # Lattice gauge Monte Carlo: measured plaquettes and Wilson loops, reproducible from the seed
+    run = lattice_monte_carlo(params.get('lattice_size', 4), params.get('group', 3), params.get('beta'),
+                              params.get('sweeps', 10), seed=params.get('seed', 0))
     return {
-        'gauge_field_strength': np.random.normal(0, 1),
-        'energy_density': np.random.exponential(1),
-        'topological_charge': np.random.randint(-10, 10)
+        'gauge_group': run['group'],
+        'plaquette': run['plaquette'],
+        'energy_density': run['action_density'],
+        'wilson_loops': run['wilson_loops'],
+        'sweeps_per_second': run['sweeps_per_second']
     }
 
-def is_prime(n):
-    """Check if a number is prime"""
-    if n < 2:
-        return False
-    for i in range(2, int(n**0.5) + 1):
-        if n % i == 0:
-            return False
-    return True
-
 def analyze_prime_patterns(primes):
     """Analyze patterns in prime numbers"""
     if len(primes) < 2:
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+ProductiveMiner Benchmark Runner
+Sweeps every work type handler over its difficulty range from
+engine_config.json and records wall time, CPU time, peak memory and
+output size. Results are compared against a saved JSON baseline, and the
+run fails when a handler has slowed down or grown by more than a threshold.
+
+   python benchmark.py --save                 # record a new baseline
+   python benchmark.py                        # compare against it
+   python benchmark.py --work-types twin-primes collatz-conjecture --points 6
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import signal
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from admission import CONFIG_TYPES, peak_memory_mb, peak_memory_reset
+from result_cache import canonical_json
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = os.getenv('BENCHMARK_BASELINE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json'))
+# Relative slowdown or memory growth that counts as a regression
+REGRESSION_THRESHOLD = 0.25
+# Differences below these floors are measurement noise, whatever their ratio
+NOISE_FLOOR_SECONDS = 0.05
+NOISE_FLOOR_MB = 16.0
+
+def difficulty_range(engine_config: Dict[str, Any], work_type: str) -> tuple:
+   """Declared difficulty range of a work type, or the engine-wide range"""
+   settings = engine_config.get('computation_settings', {})
+   declared = engine_config.get('mathematical_types', {}).get(CONFIG_TYPES.get(work_type, ''), {})
+   lo, hi = declared.get('difficulty_range', [settings.get('min_difficulty', 1), settings.get('max_difficulty', 100)])
+   return int(lo), int(hi)
+
+def sweep(lo: int, hi: int, points: int) -> List[int]:
+   """Geometrically spaced difficulties from lo to hi inclusive"""
+   if points <= 1 or lo >= hi:
+       return [lo]
+   ratio = (hi / max(lo, 1)) ** (1.0 / (points - 1))
+   return sorted({min(hi, max(lo, round(max(lo, 1) * ratio ** i))) for i in range(points)})
+
+def _measure(conn, work_type: str, difficulty: int) -> None:
+   """Child process: one seeded run of a handler, measured from a clean process"""
+   # Own process group, so a timeout also stops process pools the handler started
+   os.setpgrp()
+   from engine import perform_mathematical_computation
+   random.seed(difficulty)
+   np.random.seed(difficulty)
+   baseline_mb = peak_memory_reset()
+   cpu_started = time.process_time()
+   started = time.perf_counter()
+   try:
+       result = perform_mathematical_computation(work_type, difficulty, {})
+   except Exception as e:
+       conn.send({"status": "error", "error": f"{type(e).__name__}: {e}"})
+       return
+   wall = time.perf_counter() - started
+   children = resource.getrusage(resource.RUSAGE_CHILDREN)
+   peak_mb = peak_memory_mb()
+   conn.send({
+       "status": "ok",
+       "wall_seconds": wall,
+       # Includes process pools the handler started and waited for
+       "cpu_seconds": time.process_time() - cpu_started + children.ru_utime + children.ru_stime,
+       "peak_memory_mb": max(peak_mb - baseline_mb, 0.0) if baseline_mb is not None and peak_mb is not None else None,
+       "output_bytes": len(canonical_json(result))
+   })
+
+def run_once(work_type: str, difficulty: int, timeout: float) -> Dict[str, Any]:
+   ctx = multiprocessing.get_context('fork')
+   parent_conn, child_conn = ctx.Pipe(duplex=False)
+   process = ctx.Process(target=_measure, args=(child_conn, work_type, difficulty))
+   process.start()
+   child_conn.close()
+   try:
+       if not parent_conn.poll(timeout):
+           return {"status": "timeout"}
+       return parent_conn.recv()
+   except EOFError:
+       return {"status": "error", "error": f"Benchmark process exited with code {process.exitcode}"}
+   finally:
+       if process.is_alive():
+           try:
+               os.killpg(process.pid, signal.SIGKILL)
+           except OSError:
+               process.kill()
+       process.join()
+       parent_conn.close()
+
+def benchmark(work_type: str, difficulty: int, repeat: int, timeout: float) -> Dict[str, Any]:
+   """Median of repeated runs; the first failure or timeout ends the repeats"""
+   runs = []
+   for _ in range(repeat):
+       run = run_once(work_type, difficulty, timeout)
+       if run["status"] != "ok":
+           return run
+       runs.append(run)
+   memory = [run["peak_memory_mb"] for run in runs if run["peak_memory_mb"] is not None]
+   return {
+       "status": "ok",
+       "wall_seconds": statistics.median(run["wall_seconds"] for run in runs),
+       "wall_seconds_min": min(run["wall_seconds"] for run in runs),
+       "cpu_seconds": statistics.median(run["cpu_seconds"] for run in runs),
+       "peak_memory_mb": max(memory) if memory else None,
+       "output_bytes": runs[-1]["output_bytes"],
+       "repeat": len(runs)
+   }
+
+def run_suite(work_types: List[str], engine_config: Dict[str, Any], points: int, repeat: int,
+              timeout: float) -> Dict[str, Dict[str, Any]]:
+   """Benchmark every work type over its sweep; higher difficulties are skipped after a timeout"""
+   results: Dict[str, Dict[str, Any]] = {}
+   for work_type in work_types:
+       results[work_type] = {}
+       timed_out = False
+       for difficulty in sweep(*difficulty_range(engine_config, work_type), points):
+           if timed_out:
+               results[work_type][str(difficulty)] = {"status": "skipped"}
+               continue
+           outcome = benchmark(work_type, difficulty, repeat, timeout)
+           results[work_type][str(difficulty)] = outcome
+           timed_out = outcome["status"] == "timeout"
+           logger.info(f"{work_type} @ {difficulty}: " + (
+               f"{outcome['wall_seconds']:.4f}s wall, {outcome['cpu_seconds']:.4f}s cpu, "
+               f"{outcome['peak_memory_mb'] or 0:.1f} MB, {outcome['output_bytes']} bytes"
+               if outcome["status"] == "ok" else outcome["status"] + (f" ({outcome['error']})" if "error" in outcome else "")))
+   return results
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+   """Regressions of results against a baseline, as human-readable lines"""
+   regressions = []
+   for work_type, points in results.items():
+       for difficulty, current in points.items():
+           previous = baseline.get(work_type, {}).get(difficulty)
+           if previous is None or previous["status"] != "ok" or current["status"] == "skipped":
+               continue
+           label = f"{work_type} @ {difficulty}"
+           if current["status"] != "ok":
+               regressions.append(f"{label}: {current['status']}, baseline ran in {previous['wall_seconds']:.4f}s")
+               continue
+           before, after = previous["wall_seconds"], current["wall_seconds"]
+           if after > before * (1 + threshold) and after - before > NOISE_FLOOR_SECONDS:
+               regressions.append(f"{label}: {after:.4f}s vs {before:.4f}s baseline (+{after / before - 1:.0%})")
+           before, after = previous.get("peak_memory_mb"), current.get("peak_memory_mb")
+           if before is not None and after is not None and after > before * (1 + threshold) and after - before > NOISE_FLOOR_MB:
+               regressions.append(f"{label}: {after:.1f} MB vs {before:.1f} MB baseline peak memory")
+   return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+   from engine import ENGINE_CONFIG, MATHEMATICAL_ENGINES
+
+   parser = argparse.ArgumentParser(description="Benchmark the work type handlers against a saved baseline")
+   parser.add_argument("--work-types", nargs="+", help="Work types to run (default: all)")
+   parser.add_argument("--points", type=int, default=4, help="Difficulties per work type, spread over its range")
+   parser.add_argument("--repeat", type=int, default=3, help="Runs per difficulty; the median is recorded")
+   parser.add_argument("--timeout", type=float, default=60.0, help="Seconds per run before it counts as a timeout")
+   parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+   parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Allowed relative regression")
+   parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+   parser.add_argument("--output", help="Also write the results to this JSON file")
+   args = parser.parse_args(argv)
+
+   known = [engine["id"] for engine in MATHEMATICAL_ENGINES]
+   work_types = args.work_types or known
+   unknown = sorted(set(work_types) - set(known))
+   if unknown:
+       parser.error(f"Unknown work types: {', '.join(unknown)}")
+
+   results = run_suite(work_types, ENGINE_CONFIG, args.points, args.repeat, args.timeout)
+   report = {
+       "created_at": time.time(),
+       "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+       "settings": {"points": args.points, "repeat": args.repeat, "timeout": args.timeout},
+       "results": results
+   }
+   if args.output:
+       with open(args.output, "w") as f:
+           json.dump(report, f, indent=2)
+
+   if args.save:
+       # Merge, so a partial run only replaces the work types it covered
+       previous = {}
+       if os.path.exists(args.baseline):
+           with open(args.baseline) as f:
+               previous = json.load(f).get("results", {})
+       report["results"] = {**previous, **results}
+       with open(args.baseline, "w") as f:
+           json.dump(report, f, indent=2)
+       logger.info(f"Saved baseline for {len(results)} work types to {args.baseline}")
+       return 0
+
+   if not os.path.exists(args.baseline):
+       logger.warning(f"No baseline at {args.baseline}; run with --save to record one")
+       return 0
+   with open(args.baseline) as f:
+       regressions = compare(results, json.load(f).get("results", {}), args.threshold)
+   for line in regressions:
+       logger.error(f"Regression: {line}")
+   if regressions:
+       return 1
+   logger.info("No regressions against the baseline")
+   return 0
+
+if __name__ == "__main__":
+   logging.basicConfig(level=logging.INFO, format="%(message)s")
+   sys.exit(main())
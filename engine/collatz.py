@@ -0,0 +1,274 @@
+"""
+ProductiveMiner Collatz Engine
+Batch computation of total stopping times and maximum excursions for
+ranges of consecutive seeds. Seeds run as NumPy lanes that advance k
+shortcut steps at a time through a precomputed 2^k table, and finish as
+soon as they drop into a memo of already-verified values.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, Generator, Optional, Tuple
+
+import numpy as np
+
+from prime_store import DATA_DIR
+from streaming import drain
+
+logger = logging.getLogger(__name__)
+
+# Shortcut steps T(n) = n/2 or (3n+1)/2 taken per table jump
+JUMP_BITS = 16
+# Memory budget for the memo of stopping times and excursions (10 bytes per entry)
+COLLATZ_MEMO_MB = int(os.getenv('COLLATZ_MEMO_MB', 64))
+COLLATZ_DIR = os.getenv('COLLATZ_DIR', os.path.join(DATA_DIR, 'collatz'))
+# Seeds processed per batch of lanes
+BATCH_SIZE = 1 << 18
+
+_UINT64_MAX = (1 << 64) - 1
+
+class JumpTable:
+   """For n = a*2^k + b, k shortcut steps give T^k(n) = 3^o(b) * a + T^k(b).
+
+   The largest value the standard trajectory reaches during those steps is
+   the maximum of a few lines slope*a + intercept that depend only on b.
+   """
+
+   def __init__(self, k: int = JUMP_BITS):
+       self.k = k
+       self.mask = np.uint64((1 << k) - 1)
+       b = np.arange(1 << k, dtype=np.uint64)
+
+       vals = b.copy()
+       odd_steps = np.zeros(1 << k, dtype=np.uint64)
+       slopes = [np.full(1 << k, 1 << k, dtype=np.uint64)]  # the seed itself
+       intercepts = [b.copy()]
+       for j in range(k):
+           odd = (vals & np.uint64(1)).astype(bool)
+           # Before an odd step the standard map visits 3n + 1 = 3 * (3^o * 2^(k-j) * a + vals) + 1
+           slope = np.uint64(3) * np.uint64(3) ** odd_steps * np.uint64(1 << (k - j))
+           slopes.append(np.where(odd, slope, 0).astype(np.uint64))
+           intercepts.append(np.where(odd, np.uint64(3) * vals + np.uint64(1), 0).astype(np.uint64))
+           vals = np.where(odd, (np.uint64(3) * vals + np.uint64(1)) >> np.uint64(1), vals >> np.uint64(1))
+           odd_steps += odd
+
+       self.multiplier = np.uint64(3) ** odd_steps
+       self.offset = vals
+       self.standard_steps = (k + odd_steps).astype(np.int64)
+       self.slopes, self.intercepts = self._envelope(np.stack(slopes, axis=1), np.stack(intercepts, axis=1))
+       # Largest a for which every line stays below 2^64
+       self.max_a = (_UINT64_MAX - int(self.intercepts.max())) // max(int(self.slopes.max()), 1)
+
+   @staticmethod
+   def _envelope(slopes: np.ndarray, intercepts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+       """Drop lines that never attain the maximum for a >= 1"""
+       s = slopes.astype(np.float64)
+       v = s + intercepts.astype(np.float64)
+       lines = s.shape[1]
+       order = np.arange(lines)
+       dominated = np.zeros(slopes.shape, dtype=bool)
+       for i in range(lines):
+           beats = (s[:, [i]] >= s) & (v[:, [i]] >= v)
+           strictly = (s[:, [i]] > s) | (v[:, [i]] > v) | (order > i)
+           dominated |= beats & strictly & (order != i)
+       keep = ~dominated
+       width = int(keep.sum(axis=1).max())
+       # Stable sort puts kept lines first; pad rows by repeating their first kept line
+       rank = np.argsort(~keep, axis=1, kind='stable')[:, :width]
+       counts = keep.sum(axis=1)
+       rank = np.where(np.arange(width) < counts[:, None], rank, rank[:, :1])
+       rows = np.arange(len(slopes))[:, None]
+       return slopes[rows, rank], intercepts[rows, rank]
+
+def _single_steps(seeds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+   """Exact stopping times and excursions by stepping the standard map one step at a time"""
+   n = seeds.astype(np.uint64)
+   steps = np.zeros(len(n), dtype=np.int64)
+   peak = n.copy()
+   idx = np.flatnonzero(n > 1)
+   while len(idx):
+       v = n[idx]
+       odd = (v & np.uint64(1)).astype(bool)
+       v = np.where(odd, np.uint64(3) * v + np.uint64(1), v >> np.uint64(1))
+       n[idx] = v
+       steps[idx] += 1
+       peak[idx] = np.maximum(peak[idx], v)
+       idx = idx[v > 1]
+   return steps, peak
+
+def _scalar_trajectory(n: int) -> Tuple[int, int]:
+   """Arbitrary-precision fallback for lanes that would overflow 64 bits"""
+   steps, peak = 0, n
+   while n > 1:
+       n = 3 * n + 1 if n & 1 else n >> 1
+       peak = max(peak, n)
+       steps += 1
+   return steps, peak
+
+def replay_trajectory(n: int, max_steps: int) -> Optional[Tuple[int, int]]:
+   """(steps, peak) of the trajectory of n, or None if it does not reach 1 within max_steps"""
+   steps, peak = 0, n
+   while n > 1:
+       if steps == max_steps:
+           return None
+       n = 3 * n + 1 if n & 1 else n >> 1
+       peak = max(peak, n)
+       steps += 1
+   return steps, peak
+
+class CollatzEngine:
+   """Stopping times and excursions for consecutive seed ranges"""
+
+   def __init__(self, memo_mb: int = COLLATZ_MEMO_MB, k: int = JUMP_BITS, directory: Optional[str] = COLLATZ_DIR):
+       self.table = JumpTable(k)
+       entries = max(memo_mb * (1 << 20) // 10, 1 << k)
+       self.memo_size = 1 << (entries.bit_length() - 1)
+       self.directory = directory
+       self.memo_steps, self.memo_peak = self._load_or_build_memo()
+
+   def _memo_paths(self) -> Tuple[str, str]:
+       return (os.path.join(self.directory, f'steps_{self.memo_size}.npy'),
+               os.path.join(self.directory, f'peak_{self.memo_size}.npy'))
+
+   def _load_or_build_memo(self) -> Tuple[np.ndarray, np.ndarray]:
+       if self.directory:
+           steps_path, peak_path = self._memo_paths()
+           try:
+               return np.load(steps_path, mmap_mode='r'), np.load(peak_path, mmap_mode='r')
+           except (OSError, ValueError):
+               pass
+
+       start = time.time()
+       base = 1 << self.table.k
+       steps, peak = _single_steps(np.arange(base, dtype=np.uint64))
+       self.memo_steps, self.memo_peak = steps.astype(np.uint16), peak
+       # Grow the memo by doubling, each half computed from the half below it
+       while len(self.memo_steps) < self.memo_size:
+           lo = len(self.memo_steps)
+           # Seeds this small never leave 64 bits
+           steps, peak, _ = self._run(np.arange(lo, 2 * lo, dtype=np.uint64))
+           self.memo_steps = np.concatenate((self.memo_steps, steps.astype(np.uint16)))
+           self.memo_peak = np.concatenate((self.memo_peak, peak))
+       logger.info(f"Built Collatz memo of {self.memo_size} entries in {time.time() - start:.2f}s")
+
+       if self.directory:
+           try:
+               os.makedirs(self.directory, exist_ok=True)
+               for path, array in zip(self._memo_paths(), (self.memo_steps, self.memo_peak)):
+                   tmp_path = f'{path}.{os.getpid()}.tmp'
+                   with open(tmp_path, 'wb') as f:
+                       np.save(f, array)
+                   os.replace(tmp_path, path)
+           except OSError as e:
+               logger.warning(f"Could not persist Collatz memo: {e}")
+       return self.memo_steps, self.memo_peak
+
+   def _run(self, seeds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Dict[int, int]]:
+       """Total stopping times and maximum excursions for an array of seeds
+
+       Lanes whose trajectory leaves 64 bits are finished in Python integers;
+       their exact peaks come back keyed by lane, and their entries in the
+       peak array hold 2^64 - 1 as a placeholder.
+       """
+       table = self.table
+       memo_size = len(self.memo_steps)
+       n = seeds.astype(np.uint64)
+       steps = np.zeros(len(n), dtype=np.int64)
+       peak = n.copy()
+       idx = np.arange(len(n))
+       k = np.uint64(table.k)
+       overflowed: Dict[int, int] = {}
+
+       while len(idx):
+           cur = n[idx]
+           done = cur < memo_size
+           if done.any():
+               finished, values = idx[done], cur[done].astype(np.int64)
+               steps[finished] += self.memo_steps[values]
+               peak[finished] = np.maximum(peak[finished], self.memo_peak[values])
+               idx, cur = idx[~done], cur[~done]
+               if not len(idx):
+                   break
+
+           a = cur >> k
+           overflow = a > np.uint64(table.max_a)
+           if overflow.any():
+               for lane, value in zip(idx[overflow].tolist(), cur[overflow].tolist()):
+                   extra_steps, extra_peak = _scalar_trajectory(value)
+                   steps[lane] += extra_steps
+                   overflowed[lane] = max(int(peak[lane]), extra_peak)
+                   peak[lane] = _UINT64_MAX
+               idx, cur, a = idx[~overflow], cur[~overflow], a[~overflow]
+
+           b = (cur & table.mask).astype(np.int64)
+           excursion = (table.slopes[b] * a[:, None] + table.intercepts[b]).max(axis=1)
+           peak[idx] = np.maximum(peak[idx], excursion)
+           n[idx] = table.multiplier[b] * a + table.offset[b]
+           steps[idx] += table.standard_steps[b]
+
+       return steps, peak, overflowed
+
+   def stopping_times(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray, Dict[int, int]]:
+       """Total stopping times and maximum excursions for seeds in [start, stop), as _run"""
+       start = max(1, start)
+       return self._run(np.arange(start, max(start, stop), dtype=np.uint64))
+
+   def iter_verify_range(self, start: int, stop: int,
+                         time_budget: Optional[float] = None) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+       """Verify that every seed in [start, stop) reaches 1, yielding progress after each batch.
+
+       Stops after the batch that exhausts time_budget; the returned range
+       then ends at the last seed checked.
+       """
+       start = max(1, start)
+       if stop > _UINT64_MAX:
+           raise ValueError(f"Seeds must be below 2^64, not up to {stop}")
+       began = time.time()
+       deadline = began + time_budget if time_budget else None
+       longest = {"seed": None, "steps": -1}
+       highest = {"seed": None, "peak": 0}
+       checked = start
+       for lo in range(start, stop, BATCH_SIZE):
+           if deadline and time.time() >= deadline:
+               break
+           hi = min(lo + BATCH_SIZE, stop)
+           steps, peak, overflowed = self._run(np.arange(lo, hi, dtype=np.uint64))
+           i, j = int(np.argmax(steps)), int(np.argmax(peak))
+           if overflowed:
+               # Any trajectory that left 64 bits peaks above every one that did not
+               j = max(overflowed, key=overflowed.get)
+           if int(steps[i]) > longest["steps"]:
+               longest = {"seed": lo + i, "steps": int(steps[i])}
+           batch_peak = overflowed.get(j, int(peak[j]))
+           if batch_peak > highest["peak"]:
+               highest = {"seed": lo + j, "peak": batch_peak}
+           checked = hi
+           yield {"seeds_verified": hi - start, "checked_through": hi, "longest_trajectory": longest, "max_excursion": highest}
+       elapsed = time.time() - began
+       seeds = max(0, checked - start)
+       return {
+           "range": [start, checked],
+           "range_requested": [start, stop],
+           "completed": checked >= stop,
+           "seeds_verified": seeds,
+           "longest_trajectory": longest,
+           "max_excursion": highest,
+           "memo_size": self.memo_size,
+           "jump_bits": self.table.k,
+           "elapsed_seconds": elapsed,
+           "seeds_per_second": seeds / elapsed if elapsed > 0 else 0.0
+       }
+
+   def verify_range(self, start: int, stop: int) -> Dict[str, Any]:
+       """Verify that every seed in [start, stop) reaches 1, batch by batch"""
+       return drain(self.iter_verify_range(start, stop))
+
+_engine: Optional[CollatzEngine] = None
+
+def get_collatz_engine() -> CollatzEngine:
+   """Process-wide Collatz engine, sharing the on-disk memo with other workers"""
+   global _engine
+   if _engine is None:
+       _engine = CollatzEngine()
+   return _engine
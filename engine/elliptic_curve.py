@@ -0,0 +1,413 @@
+"""
+ProductiveMiner Elliptic Curves
+Arithmetic on short Weierstrass curves y^2 = x^3 + ax + b over prime
+fields. Points are added and doubled in Jacobian coordinates, so a scalar
+multiplication needs no field inversion until its result is normalized.
+Scalars are recoded in width-w NAF against a table of odd multiples of the
+base point, kept per base point, and many results are normalized at once
+with a single inversion (Montgomery's trick). Group orders of curves over
+small primes come from baby-step giant-step searches in the Hasse interval.
+"""
+
+import math
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from arithmetic import factorize, is_prime, jacobi
+
+# An affine point (x, y), or None for the point at infinity; a Jacobian (X, Y, Z) is (X/Z^2, Y/Z^3), at infinity when Z = 0
+Affine = Optional[Tuple[int, int]]
+Jacobian = Tuple[int, int, int]
+
+INFINITY: Jacobian = (1, 1, 0)
+# wNAF window for base points used once; fixed base points get wider tables
+WNAF_WIDTH = 4
+FIXED_BASE_WIDTH = 7
+# Tables of odd multiples kept per curve
+MAX_TABLES = int(os.getenv('EC_MAX_TABLES', 64))
+# Random points whose orders are combined before a point count is given up as ambiguous
+POINT_COUNT_ATTEMPTS = 16
+# Below this field size an ambiguous point count falls back to counting square roots directly
+DIRECT_COUNT_LIMIT = 1 << 20
+
+# NIST prime curves (FIPS 186-4): field prime, b, generator and its prime order; a = -3 throughout
+NIST_CURVES = {
+   "P-192": (2**192 - 2**64 - 1,
+             0x64210519e59c80e70fa7e9ab72243049feb8deecc146b9b1,
+             (0x188da80eb03090f67cbf20eb43a18800f4ff0afd82ff1012, 0x07192b95ffc8da78631011ed6b24cdd573f977a11e794811),
+             0xffffffffffffffffffffffff99def836146bc9b1b4d22831),
+   "P-224": (2**224 - 2**96 + 1,
+             0xb4050a850c04b3abf54132565044b0b7d7bfd8ba270b39432355ffb4,
+             (0xb70e0cbd6bb4bf7f321390b94a03c1d356c21122343280d6115c1d21, 0xbd376388b5f723fb4c22dfe6cd4375a05a07476444d5819985007e34),
+             0xffffffffffffffffffffffffffff16a2e0b8f03e13dd29455c5c2a3d),
+   "P-256": (2**256 - 2**224 + 2**192 + 2**96 - 1,
+             0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+             (0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296, 0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5),
+             0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551)
+}
+
+def batch_inverse(values: List[int], p: int) -> List[int]:
+   """Inverses of non-zero values mod p from one modular inversion and 3(n - 1) multiplications"""
+   prefix = []
+   acc = 1
+   for v in values:
+       prefix.append(acc)
+       acc = acc * v % p
+   inverse = pow(acc, -1, p)
+   result = [0] * len(values)
+   for i in range(len(values) - 1, -1, -1):
+       result[i] = inverse * prefix[i] % p
+       inverse = inverse * values[i] % p
+   return result
+
+def sqrt_mod(a: int, p: int) -> Optional[int]:
+   """A square root of a modulo an odd prime p (Tonelli-Shanks), or None for a non-residue"""
+   a %= p
+   if a == 0:
+       return 0
+   if jacobi(a, p) != 1:
+       return None
+   if p & 3 == 3:
+       return pow(a, (p + 1) >> 2, p)
+   q, s = p - 1, 0
+   while not q & 1:
+       q >>= 1
+       s += 1
+   z = next(z for z in range(2, p) if jacobi(z, p) == -1)
+   m, c, t, root = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) >> 1, p)
+   while t != 1:
+       i, t2 = 0, t
+       while t2 != 1:
+           t2 = t2 * t2 % p
+           i += 1
+       b = pow(c, 1 << (m - i - 1), p)
+       m, c = i, b * b % p
+       t, root = t * c % p, root * b % p
+   return root
+
+def wnaf(k: int, w: int) -> List[int]:
+   """Width-w NAF of k >= 0, least significant digit first: odd digits below 2^(w-1) in absolute value, at least w - 1 zeros between them"""
+   digits = []
+   while k:
+       if k & 1:
+           d = k & ((1 << w) - 1)
+           if d >= 1 << (w - 1):
+               d -= 1 << w
+           k -= d
+       else:
+           d = 0
+       digits.append(d)
+       k >>= 1
+   return digits
+
+class Curve:
+   """y^2 = x^3 + ax + b over F_p, with an optional generator of known order"""
+
+   def __init__(self, p: int, a: int, b: int, generator: Affine = None, order: Optional[int] = None, name: Optional[str] = None):
+       self.p, self.a, self.b = p, a % p, b % p
+       if (4 * self.a ** 3 + 27 * self.b ** 2) % p == 0:
+           raise ValueError(f"Singular curve: a={a}, b={b} mod {p}")
+       self.generator, self.order, self.name = generator, order, name
+       # The doubling formula saves a squaring when a = -3, as on the NIST curves
+       self._a_is_minus_3 = self.a == p - 3
+       self._tables: Dict[Tuple[Tuple[int, int], int], List[Tuple[int, int]]] = {}
+
+   @classmethod
+   def nist(cls, name: str) -> "Curve":
+       p, b, generator, order = NIST_CURVES[name]
+       return cls(p, -3, b, generator, order, name)
+
+   def contains(self, point: Affine) -> bool:
+       if point is None:
+           return True
+       x, y = point
+       return (y * y - (x * x + self.a) * x - self.b) % self.p == 0
+
+   def random_point(self, rng: random.Random) -> Tuple[int, int]:
+       while True:
+           x = rng.randrange(self.p)
+           y = sqrt_mod((x * x + self.a) * x + self.b, self.p)
+           if y is not None:
+               return (x, y if rng.random() < 0.5 else (self.p - y) % self.p)
+
+   def negate(self, point: Affine) -> Affine:
+       return None if point is None else (point[0], (self.p - point[1]) % self.p)
+
+   def double(self, P: Jacobian) -> Jacobian:
+       """2P (dbl-2001-b for a = -3, dbl-2007-bl otherwise)"""
+       X, Y, Z = P
+       p = self.p
+       if Z == 0 or Y == 0:
+           return INFINITY
+       YY = Y * Y % p
+       ZZ = Z * Z % p
+       S = 4 * X * YY % p
+       if self._a_is_minus_3:
+           M = 3 * (X - ZZ) * (X + ZZ) % p
+       else:
+           M = (3 * X * X + self.a * ZZ * ZZ) % p
+       X3 = (M * M - 2 * S) % p
+       Y3 = (M * (S - X3) - 8 * YY * YY) % p
+       Z3 = 2 * Y * Z % p
+       return (X3, Y3, Z3)
+
+   def add(self, P: Jacobian, Q: Jacobian) -> Jacobian:
+       """P + Q for Jacobian P and Q (add-2007-bl)"""
+       if P[2] == 0:
+           return Q
+       if Q[2] == 0:
+           return P
+       p = self.p
+       X1, Y1, Z1 = P
+       X2, Y2, Z2 = Q
+       Z1Z1 = Z1 * Z1 % p
+       Z2Z2 = Z2 * Z2 % p
+       U1 = X1 * Z2Z2 % p
+       U2 = X2 * Z1Z1 % p
+       S1 = Y1 * Z2 * Z2Z2 % p
+       S2 = Y2 * Z1 * Z1Z1 % p
+       H = (U2 - U1) % p
+       r = (S2 - S1) % p
+       if H == 0:
+           return self.double(P) if r == 0 else INFINITY
+       HH = H * H % p
+       HHH = H * HH % p
+       V = U1 * HH % p
+       X3 = (r * r - HHH - 2 * V) % p
+       Y3 = (r * (V - X3) - S1 * HHH) % p
+       Z3 = Z1 * Z2 * H % p
+       return (X3, Y3, Z3)
+
+   def add_affine(self, P: Jacobian, q: Tuple[int, int]) -> Jacobian:
+       """P + q for Jacobian P and affine q (madd-2007-bl): 7 multiplications and 4 squarings"""
+       X1, Y1, Z1 = P
+       if Z1 == 0:
+           return (q[0], q[1], 1)
+       p = self.p
+       Z1Z1 = Z1 * Z1 % p
+       U2 = q[0] * Z1Z1 % p
+       S2 = q[1] * Z1 * Z1Z1 % p
+       H = (U2 - X1) % p
+       r = 2 * (S2 - Y1) % p
+       if H == 0:
+           return self.double(P) if r == 0 else INFINITY
+       HH = H * H % p
+       I = 4 * HH % p
+       J = H * I % p
+       V = X1 * I % p
+       X3 = (r * r - J - 2 * V) % p
+       Y3 = (r * (V - X3) - 2 * Y1 * J) % p
+       Z3 = ((Z1 + H) ** 2 - Z1Z1 - HH) % p
+       return (X3, Y3, Z3)
+
+   def to_affine(self, P: Jacobian) -> Affine:
+       X, Y, Z = P
+       if Z == 0:
+           return None
+       z = pow(Z, -1, self.p)
+       zz = z * z % self.p
+       return (X * zz % self.p, Y * zz * z % self.p)
+
+   def to_affine_batch(self, points: List[Jacobian]) -> List[Affine]:
+       """Normalize many points with one field inversion"""
+       finite = [i for i, P in enumerate(points) if P[2]]
+       inverses = batch_inverse([points[i][2] for i in finite], self.p) if finite else []
+       result: List[Affine] = [None] * len(points)
+       for i, z in zip(finite, inverses):
+           X, Y, _ = points[i]
+           zz = z * z % self.p
+           result[i] = (X * zz % self.p, Y * zz * z % self.p)
+       return result
+
+   def table(self, point: Tuple[int, int], w: int) -> List[Tuple[int, int]]:
+       """Affine odd multiples P, 3P, ..., (2^(w-1) - 1)P, computed once per base point and window"""
+       key = (point, w)
+       cached = self._tables.get(key)
+       if cached is not None:
+           return cached
+       twice = self.double((point[0], point[1], 1))
+       multiples = [(point[0], point[1], 1)]
+       for _ in range((1 << (w - 2)) - 1):
+           multiples.append(self.add(multiples[-1], twice))
+       table = self.to_affine_batch(multiples)
+       if any(q is None for q in table):
+           # A point of order below 2^(w-1): no table, multiply bit by bit
+           table = []
+       if len(self._tables) >= MAX_TABLES:
+           self._tables.pop(next(iter(self._tables)))
+       self._tables[key] = table
+       return table
+
+   def multiply_jacobian(self, k: int, point: Affine, w: int = WNAF_WIDTH) -> Jacobian:
+       """kP by width-w NAF: one doubling per bit and a mixed addition per non-zero digit"""
+       if point is None:
+           return INFINITY
+       if self.order:
+           k %= self.order
+       if k < 0:
+           k, point = -k, self.negate(point)
+       table = self.table(point, w) if w >= 2 else []
+       if not table:
+           table, w = [point], 2
+       p = self.p
+       Q = INFINITY
+       for d in reversed(wnaf(k, w)):
+           Q = self.double(Q)
+           if d > 0:
+               Q = self.add_affine(Q, table[d >> 1])
+           elif d < 0:
+               x, y = table[(-d) >> 1]
+               Q = self.add_affine(Q, (x, p - y))
+       return Q
+
+   def multiply(self, k: int, point: Affine, w: int = WNAF_WIDTH) -> Affine:
+       return self.to_affine(self.multiply_jacobian(k, point, w))
+
+   def point_order(self, point: Tuple[int, int], multiple: int) -> int:
+       """Order of a point from a multiple of it, by stripping prime factors"""
+       order = multiple
+       for q in factorize(multiple):
+           while order % q == 0 and self.multiply_jacobian(order // q, point, 2)[2] == 0:
+               order //= q
+       return order
+
+   def _hasse_multiple(self, point: Tuple[int, int]) -> int:
+       """Some N with |p + 1 - N| <= 2 sqrt(p) and NP = O, by baby-step giant-step in about 4 p^(1/4) additions"""
+       p = self.p
+       # t = p + 1 - N is written i (2m + 1) + s with |s| <= m
+       m = math.isqrt(math.isqrt(16 * p)) + 1
+       baby: List[Jacobian] = [(point[0], point[1], 1)]
+       for _ in range(m - 1):
+           baby.append(self.add_affine(baby[-1], point))
+       for j, P in enumerate(baby, 1):
+           if P[2] == 0:
+               return j
+       positions = {q[0]: (j, q[1]) for j, q in enumerate(self.to_affine_batch(baby), 1)}
+
+       step = self.to_affine(self.multiply_jacobian(2 * m + 1, point, 2))
+       if step is None:
+           return 2 * m + 1
+       bound = math.isqrt(4 * p) + 1
+       span = bound // (2 * m + 1) + 1
+       # Giant steps R_i = (p + 1) P - i (2m + 1) P for i = -span..span
+       R = self.add(self.multiply_jacobian(p + 1, point), self.multiply_jacobian(span * (2 * m + 1), point))
+       giant = []
+       for _ in range(2 * span + 1):
+           giant.append(R)
+           R = self.add_affine(R, self.negate(step))
+       for g, q in enumerate(self.to_affine_batch(giant)):
+           i = g - span
+           if q is None:
+               s = 0
+           elif q[0] in positions:
+               j, y = positions[q[0]]
+               s = j if y == q[1] else -j
+           else:
+               continue
+           t = i * (2 * m + 1) + s
+           if t * t <= 4 * p:
+               return p + 1 - t
+       raise ArithmeticError(f"No multiple of the point in the Hasse interval of p = {p}")
+
+   def _count_directly(self) -> int:
+       """#E(F_p) as 1 + the number of square roots of x^3 + ax + b over all x; for p below DIRECT_COUNT_LIMIT"""
+       p = self.p
+       x = np.arange(p, dtype=np.int64)
+       roots = np.bincount(x * x % p, minlength=p)
+       return 1 + int(roots[((x * x % p + self.a) * x + self.b) % p].sum())
+
+   def count_points(self, rng: Optional[random.Random] = None) -> Optional[int]:
+       """#E(F_p) from the lcm of random point orders, once a single multiple of it lies in the Hasse interval.
+
+       Returns None in the rare case the group exponent stays too small to
+       decide (and p is too large to count directly).
+       """
+       rng = rng or random.Random(self.p)
+       p = self.p
+       width = math.isqrt(4 * p)
+       low, high = p + 1 - width, p + 1 + width
+       exponent = 1
+       for _ in range(POINT_COUNT_ATTEMPTS):
+           point = self.random_point(rng)
+           order = self.point_order(point, self._hasse_multiple(point))
+           exponent = exponent * order // math.gcd(exponent, order)
+           candidates = range(-(-low // exponent) * exponent, high + 1, exponent)
+           if len(candidates) == 1:
+               return candidates[0]
+       return self._count_directly() if p < DIRECT_COUNT_LIMIT else None
+
+def verify_points(curve: Curve, points: List[Jacobian]) -> int:
+   """How many of the Jacobian points lie on the curve, normalized together by batch inversion"""
+   return sum(curve.contains(q) for q in curve.to_affine_batch(points))
+
+def _throughput(count: int, seconds: float) -> Dict[str, Any]:
+   return {"multiplications": count, "seconds": seconds, "per_second": count / seconds if seconds > 0 else 0.0}
+
+def scalar_multiplication_benchmark(curve: Curve, count: int, rng: random.Random, deadline: Optional[float] = None) -> Dict[str, Any]:
+   """Time count random multiples of the generator (fixed base) and of those multiples (variable base), then check them all.
+
+   Fixed-base multiplications share one wide table; each variable-base one
+   builds its own. Every result is normalized in one batch inversion and
+   tested against the curve equation.
+   """
+   G = curve.generator
+   started = time.time()
+   curve.table(G, FIXED_BASE_WIDTH)
+   table_seconds = time.time() - started
+
+   fixed: List[Jacobian] = []
+   started = time.time()
+   while len(fixed) < (count + 1) // 2 and not (deadline and time.time() >= deadline):
+       fixed.append(curve.multiply_jacobian(rng.randrange(1, curve.order), G, FIXED_BASE_WIDTH))
+   fixed_seconds = time.time() - started
+   bases = [q for q in curve.to_affine_batch(fixed) if q is not None]
+
+   variable: List[Jacobian] = []
+   started = time.time()
+   for base in bases[:count - len(fixed)]:
+       if deadline and time.time() >= deadline:
+           break
+       variable.append(curve.multiply_jacobian(rng.randrange(1, curve.order), base))
+   variable_seconds = time.time() - started
+
+   started = time.time()
+   verified = verify_points(curve, fixed + variable)
+   normalization_seconds = time.time() - started
+   # (n - 1) G = -G, computed without reducing the scalar, confirms the generator's order
+   order_verified = curve.to_affine(curve.add_affine(curve.multiply_jacobian(curve.order - 1, G), G)) is None
+   return {
+       "fixed_base": _throughput(len(fixed), fixed_seconds),
+       "variable_base": _throughput(len(variable), variable_seconds),
+       "scalar_mults_per_second": _throughput(len(fixed) + len(variable), fixed_seconds + variable_seconds)["per_second"],
+       "table_seconds": table_seconds,
+       "verified_points": verified,
+       "normalization_seconds": normalization_seconds,
+       "order_verified": order_verified,
+       "completed": len(fixed) + len(variable) == count
+   }
+
+def count_random_curves(bits: int, count: int, rng: random.Random, deadline: Optional[float] = None) -> Dict[str, Any]:
+   """Group orders of count random curves over one random prime of the given bit length"""
+   p = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+   while not is_prime(p):
+       p += 2
+   curves = []
+   started = time.time()
+   while len(curves) < count and not (deadline and time.time() >= deadline):
+       try:
+           curve = Curve(p, rng.randrange(p), rng.randrange(p))
+       except ValueError:
+           continue
+       order = curve.count_points(rng)
+       curves.append({
+           "a": curve.a,
+           "b": curve.b,
+           "order": order,
+           "trace": None if order is None else p + 1 - order,
+           "prime_order": order is not None and is_prime(order)
+       })
+   return {"prime": p, "curves": curves, "seconds": time.time() - started, "completed": len(curves) == count}
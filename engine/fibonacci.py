@@ -0,0 +1,155 @@
+"""
+ProductiveMiner Fibonacci Engine
+Fibonacci and Lucas numbers by fast doubling in O(log n) steps, exactly
+or modulo m, with Pisano periods for residue statistics. Huge values are
+never materialized: their digit count and leading digits come from
+Binet's formula, their trailing digits and a fingerprint from modular
+fast doubling.
+"""
+
+import math
+from collections import Counter
+from decimal import Decimal, localcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from arithmetic import factorize
+
+# Values up to this many bits are returned in full
+EXACT_VALUE_BITS = 64
+# Fingerprint modulus: the Mersenne prime 2^61 - 1
+FINGERPRINT_MODULUS = (1 << 61) - 1
+# Largest modulus whose residue distribution is enumerated over a Pisano period (at most 6m terms)
+MAX_RESIDUE_MODULUS = 100_000
+
+def fibonacci_pair(n: int, m: Optional[int] = None) -> Tuple[int, int]:
+   """(F(n), F(n+1)), reduced modulo m when given, by fast doubling"""
+   a, b = 0, 1
+   for bit in bin(n)[2:]:
+       # F(2k) = F(k) (2 F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
+       a, b = a * (2 * b - a), a * a + b * b
+       if bit == '1':
+           a, b = b, a + b
+       if m is not None:
+           a, b = a % m, b % m
+   return a, b
+
+def fibonacci(n: int, m: Optional[int] = None) -> int:
+   return fibonacci_pair(n, m)[0]
+
+def lucas(n: int, m: Optional[int] = None) -> int:
+   """L(n) = 2 F(n+1) - F(n)"""
+   f, g = fibonacci_pair(n, m)
+   value = 2 * g - f
+   return value % m if m is not None else value
+
+def _pisano_prime(p: int) -> int:
+   """Period of F mod prime p: a divisor of p - 1, 2(p + 1), or 20 for p = 5"""
+   if p == 2:
+       return 3
+   if p == 5:
+       return 20
+   bound = p - 1 if p % 5 in (1, 4) else 2 * (p + 1)
+   period = bound
+   # Strip prime factors from the bound while F still repeats
+   for q in factorize(bound):
+       while period % q == 0 and fibonacci_pair(period // q, p) == (0, 1):
+           period //= q
+   return period
+
+def pisano_period(m: int) -> int:
+   """Period of the Fibonacci sequence modulo m >= 1.
+
+   Combined from prime powers as lcm of p^(k-1) pi(p); the result is
+   checked, so a prime violating Wall's conjecture falls back to a search.
+   """
+   if m == 1:
+       return 1
+   period = 1
+   for p, k in factorize(m).items():
+       component = p ** (k - 1) * _pisano_prime(p)
+       period = period * component // math.gcd(period, component)
+   if fibonacci_pair(period, m) != (0, 1):
+       period = next(k for k in range(1, 6 * m + 1) if fibonacci_pair(k, m) == (0, 1))
+   return period
+
+def residue_counts(length: int, m: int) -> Dict[int, int]:
+   """How often each residue occurs among F(0), ..., F(length - 1) modulo m, from one Pisano period"""
+   period = pisano_period(m)
+   cycle = []
+   a, b = 0, 1 % m
+   for _ in range(period):
+       cycle.append(a)
+       a, b = b, (a + b) % m
+   full, partial = divmod(length, period)
+   counts = Counter({r: c * full for r, c in Counter(cycle).items()})
+   counts.update(cycle[:partial])
+   return dict(sorted((r, c) for r, c in counts.items() if c))
+
+def residue_summary(counts: Dict[int, int], m: int, top: int = 10) -> Dict[str, Any]:
+   """Missing residues, most frequent residues and a chi-square statistic against uniform, instead of all m counts"""
+   total = sum(counts.values())
+   expected = total / m
+   # Residues that never occur contribute expected^2 / expected = expected each
+   chi_square = sum((c - expected) ** 2 for c in counts.values()) / expected + (m - len(counts)) * expected
+   ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+   return {
+       "residues_seen": len(counts),
+       "residues_missing": m - len(counts),
+       "most_common": [[r, c] for r, c in ranked[:top]],
+       "min_count": ranked[-1][1] if len(counts) == m else 0,
+       "max_count": ranked[0][1] if ranked else 0,
+       # Under uniformity, chi-square has m - 1 degrees of freedom
+       "chi_square": chi_square,
+       "degrees_of_freedom": m - 1
+   }
+
+def even_count(length: int) -> int:
+   """Even terms among F(0), ..., F(length - 1): exactly the indices divisible by 3"""
+   return (length + 2) // 3
+
+def _log10_binet(n: int, lucas_number: bool) -> Decimal:
+   """log10 of phi^n / sqrt(5) (Fibonacci) or phi^n (Lucas), to 50 significant digits"""
+   with localcontext() as ctx:
+       ctx.prec = 50 + len(str(n))
+       five = Decimal(5)
+       phi = (1 + five.sqrt()) / 2
+       value = n * phi.log10()
+       return value if lucas_number else value - five.sqrt().log10()
+
+def summarize(n: int, lucas_number: bool = False, last_digits: int = 12) -> Dict[str, Any]:
+   """Digit count, leading and trailing digits and a fingerprint of F(n) or L(n), without computing it"""
+   value_of = lucas if lucas_number else fibonacci
+   summary: Dict[str, Any] = {"index": n}
+   # Small values: exact, and digit counts straight from the number
+   if n <= 100:
+       value = value_of(n)
+       summary["digits"] = len(str(value))
+       summary["leading_digits"] = str(value)[:last_digits]
+       if value.bit_length() <= EXACT_VALUE_BITS:
+           summary["value"] = value
+   else:
+       log10 = _log10_binet(n, lucas_number)
+       whole = int(log10)
+       summary["digits"] = whole + 1
+       with localcontext() as ctx:
+           ctx.prec = 50
+           summary["leading_digits"] = str(int(Decimal(10) ** (log10 - whole + last_digits - 1)))[:last_digits]
+   summary["last_digits"] = str(value_of(n, 10 ** last_digits)).zfill(min(last_digits, summary["digits"]))
+   summary["hash"] = f"{value_of(n, FINGERPRINT_MODULUS):016x}"
+   return summary
+
+def golden_ratio_approximation(n: int) -> float:
+   """F(n) / F(n - 1), which equals phi to double precision from n = 40 on"""
+   if n < 2:
+       return 0.0
+   if n <= 80:
+       f, g = fibonacci_pair(n - 1)
+       return g / f
+   return (1 + math.sqrt(5)) / 2
+
+def fibonacci_up_to(limit: int) -> List[int]:
+   """Fibonacci numbers F(0), F(1), ... up to and including the first one >= limit"""
+   values = [0, 1]
+   while values[-1] < limit:
+       values.append(values[-1] + values[-2])
+   return values
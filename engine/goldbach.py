@@ -0,0 +1,134 @@
+"""
+ProductiveMiner Goldbach Range Verification
+Verifies the Goldbach conjecture for every even number in a range at once:
+minimal Goldbach primes come from vectorized lookups into a sieved window,
+and representation counts from an FFT self-convolution of the odd-prime
+indicator.
+"""
+
+import os
+from typing import Any, Dict, Generator, Optional, Tuple
+
+import numpy as np
+
+from sieve import primes_in_range, small_primes
+from streaming import drain
+
+# Even numbers handled per chunk when searching minimal Goldbach primes
+GOLDBACH_CHUNK_EVENS = 1 << 22
+# Largest range end for which representation counts are computed by FFT
+GOLDBACH_FFT_LIMIT = int(os.getenv('GOLDBACH_FFT_LIMIT', 2 * 10**7))
+# Initial bound on the small prime p; minimal Goldbach primes are tiny in practice
+_INITIAL_PRIME_BOUND = 1 << 12
+
+def minimal_goldbach_primes(start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+   """Smallest prime p with n - p prime, for every even n in [start, end].
+
+   Returns (evens, min_primes); min_primes is 0 where no representation exists.
+   """
+   start = max(4, start + start % 2)
+   evens = np.arange(start, end + 1, 2, dtype=np.int64)
+   result = np.zeros(len(evens), dtype=np.int64)
+   if not len(evens):
+       return evens, result
+   result[evens == 4] = 2
+
+   bound = _INITIAL_PRIME_BOUND
+   pending = np.flatnonzero(result == 0)
+   while len(pending):
+       bound = min(bound, end)
+       # Odd-only prime indicator over the window that n - p can fall into
+       lo = max(3, start - bound) | 1
+       indicator = np.zeros((end - lo) // 2 + 1, dtype=bool)
+       indicator[(primes_in_range(lo, end) - lo) // 2] = True
+
+       for p in small_primes(bound)[1:]:
+           q = evens[pending] - p
+           valid = q >= lo
+           hit = valid & indicator[np.where(valid, q - lo, 0) // 2]
+           result[pending[hit]] = p
+           pending = pending[~hit]
+           if not len(pending):
+               break
+
+       if bound >= end:
+           break
+       bound *= 4
+
+   return evens, result
+
+def goldbach_representation_counts(limit: int) -> np.ndarray:
+   """Number of unordered representations n = p + q, for every even n <= limit.
+
+   Index k of the result corresponds to n = 2k. The odd-prime indicator is
+   convolved with itself by FFT, so every even number is counted in one pass.
+   """
+   m = (limit + 1) // 2
+   indicator = np.zeros(m, dtype=np.float64)
+   indicator[(primes_in_range(3, limit + 1) - 1) // 2] = 1.0
+
+   size = 1 << max(1, (2 * m - 1).bit_length())
+   spectrum = np.fft.rfft(indicator, size)
+   spectrum *= spectrum
+   # Slot i stands for 2i + 1, so slot k of the convolution is n = 2k + 2
+   ordered = np.rint(np.fft.irfft(spectrum, size)[:m]).astype(np.int64)
+   del spectrum
+
+   counts = np.zeros(limit // 2 + 1, dtype=np.int64)
+   counts[1:] = ordered[:len(counts) - 1]
+   # Ordered pairs count p != q twice; add the p == q term (k = n/2 an odd prime) before halving
+   odd_k = np.arange(1, len(counts), 2)
+   counts[odd_k] += indicator[(odd_k - 1) // 2].astype(np.int64)
+   counts //= 2
+   if len(counts) > 2:
+       counts[2] = 1  # 4 = 2 + 2, the only representation using the even prime
+   return counts
+
+def iter_verify_goldbach_range(start: int, end: int,
+                               count_representations: Optional[bool] = None) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+   """Verify Goldbach's conjecture for every even n in [start, end], yielding progress after each chunk"""
+   start = max(4, start + start % 2)
+   end = max(end, start - 2)
+   # The FFT spans all of [0, end]; past the limit it is never run, whatever was asked
+   count_representations = end <= GOLDBACH_FFT_LIMIT and (count_representations is None or bool(count_representations))
+
+   evens_checked = 0
+   counterexamples = []
+   largest = {"n": None, "p": 0}
+   sample = []
+   for chunk_start in range(start, end + 1, 2 * GOLDBACH_CHUNK_EVENS):
+       chunk_end = min(chunk_start + 2 * GOLDBACH_CHUNK_EVENS - 2, end)
+       evens, min_primes = minimal_goldbach_primes(chunk_start, chunk_end)
+       evens_checked += len(evens)
+       counterexamples.extend(evens[min_primes == 0][:10 - len(counterexamples)].tolist())
+       if len(min_primes):
+           i = int(np.argmax(min_primes))
+           if int(min_primes[i]) > largest["p"]:
+               largest = {"n": int(evens[i]), "p": int(min_primes[i])}
+       if not sample:
+           sample = [{"n": int(n), "min_prime": int(p)} for n, p in zip(evens[:5], min_primes[:5])]
+       yield {"evens_checked": evens_checked, "checked_through": chunk_end, "counterexamples": len(counterexamples)}
+
+   summary = {
+       "start": start,
+       "end": end,
+       "evens_checked": evens_checked,
+       "all_verified": not counterexamples,
+       "counterexamples": counterexamples,
+       "largest_minimal_prime": largest,
+       "sample": sample
+   }
+
+   if count_representations and evens_checked:
+       counts = goldbach_representation_counts(end)[start // 2:end // 2 + 1]
+       lo, hi = int(np.argmin(counts)), int(np.argmax(counts))
+       summary["fewest_representations"] = {"n": start + 2 * lo, "count": int(counts[lo])}
+       summary["most_representations"] = {"n": start + 2 * hi, "count": int(counts[hi])}
+       for i, item in enumerate(sample):
+           item["representations"] = int(counts[i])
+
+   return summary
+
+def verify_goldbach_range(start: int, end: int, count_representations: Optional[bool] = None) -> Dict[str, Any]:
+   """Verify Goldbach's conjecture for every even n in [start, end] in one pass"""
+   return drain(iter_verify_goldbach_range(start, end, count_representations))
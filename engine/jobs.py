@@ -0,0 +1,298 @@
+"""
+ProductiveMiner Job Queue
+Asynchronous computation jobs: submissions get a job ID and wait in a
+bounded priority queue, cheapest work types and lowest difficulties
+first. Heavy work types may only occupy part of the dispatchers, so slow
+jobs cannot starve cheap ones, and every job runs under a hard deadline.
+Queue and job records live in process memory or in Redis.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from worker_pool import ComputationTimeout
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 1000))
+# Seconds finished job records are kept for polling
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 3600))
+# redis:// URL of a shared job backend; in-process queue when unset
+JOB_BACKEND_URL = os.getenv('JOB_BACKEND_URL', '')
+
+LANES = ("light", "heavy")
+FINISHED_STATES = ("completed", "failed", "timed_out", "cancelled")
+
+class JobQueueFull(Exception):
+   """Raised when a lane of the job queue is at capacity"""
+
+def job_score(rank: int, difficulty: int, sequence: int) -> float:
+   """Queue order: complexity rank, then difficulty, then submission order"""
+   return (rank * 1000 + min(max(difficulty, 0), 999)) * 1e9 + sequence % 1_000_000_000
+
+class MemoryJobBackend:
+   """Priority queues and job records held in this process"""
+
+   def __init__(self):
+       self._queues: Dict[str, List[Tuple[float, str]]] = {lane: [] for lane in LANES}
+       self._records: Dict[str, Dict[str, Any]] = {}
+       self._sequence = 0
+
+   def next_sequence(self) -> int:
+       self._sequence += 1
+       return self._sequence
+
+   def push(self, lane: str, job_id: str, score: float) -> None:
+       heapq.heappush(self._queues[lane], (score, job_id))
+
+   def pop(self, lane: str) -> Optional[str]:
+       queue = self._queues[lane]
+       return heapq.heappop(queue)[1] if queue else None
+
+   def remove(self, lane: str, job_id: str) -> bool:
+       queue = self._queues[lane]
+       for i, (_, queued_id) in enumerate(queue):
+           if queued_id == job_id:
+               queue[i] = queue[-1]
+               queue.pop()
+               heapq.heapify(queue)
+               return True
+       return False
+
+   def size(self, lane: str) -> int:
+       return len(self._queues[lane])
+
+   def save(self, job: Dict[str, Any]) -> None:
+       self._records[job["job_id"]] = job
+       now = time.time()
+       expired = [job_id for job_id, record in self._records.items()
+                  if record["status"] in FINISHED_STATES and now - (record["finished_at"] or now) > JOB_RESULT_TTL]
+       for job_id in expired:
+           del self._records[job_id]
+
+   def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+       return self._records.get(job_id)
+
+class RedisJobBackend:
+   """Priority queues as sorted sets and job records as JSON strings in Redis.
+
+   Works with any client exposing the redis-py methods used here, so a local
+   stand-in can replace a Redis server.
+   """
+
+   def __init__(self, client, prefix: str = "productiveminer:jobs"):
+       self.client = client
+       self.prefix = prefix
+
+   def _queue_key(self, lane: str) -> str:
+       return f"{self.prefix}:queue:{lane}"
+
+   def _record_key(self, job_id: str) -> str:
+       return f"{self.prefix}:record:{job_id}"
+
+   def next_sequence(self) -> int:
+       return int(self.client.incr(f"{self.prefix}:sequence"))
+
+   def push(self, lane: str, job_id: str, score: float) -> None:
+       self.client.zadd(self._queue_key(lane), {job_id: score})
+
+   def pop(self, lane: str) -> Optional[str]:
+       popped = self.client.zpopmin(self._queue_key(lane))
+       if not popped:
+           return None
+       job_id = popped[0][0]
+       return job_id.decode() if isinstance(job_id, bytes) else job_id
+
+   def remove(self, lane: str, job_id: str) -> bool:
+       return bool(self.client.zrem(self._queue_key(lane), job_id))
+
+   def size(self, lane: str) -> int:
+       return int(self.client.zcard(self._queue_key(lane)))
+
+   def save(self, job: Dict[str, Any]) -> None:
+       ttl = JOB_RESULT_TTL if job["status"] in FINISHED_STATES else None
+       self.client.set(self._record_key(job["job_id"]), json.dumps(job), ex=ttl)
+
+   def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+       data = self.client.get(self._record_key(job_id))
+       return json.loads(data) if data else None
+
+def create_job_backend(url: str = JOB_BACKEND_URL):
+   """In-process backend, or a Redis backend when a URL is configured"""
+   if not url:
+       return MemoryJobBackend()
+   import redis  # optional dependency, only needed for a shared backend
+   return RedisJobBackend(redis.from_url(url))
+
+# Runs (work_type, difficulty, parameters) within a timeout in seconds
+JobRunner = Callable[[str, int, Dict[str, Any], float], Awaitable[Dict[str, Any]]]
+
+class JobManager:
+   """Dispatches queued jobs to a runner, keeping a share of dispatchers for light work"""
+
+   def __init__(self, runner: JobRunner, classify: Callable[[str], Tuple[str, int]], dispatchers: int,
+                max_deadline: float, heavy_share: float = 0.5, max_queued: int = JOB_QUEUE_SIZE, backend=None):
+       self.runner = runner
+       self.classify = classify
+       self.dispatchers = max(1, dispatchers)
+       self.heavy_limit = max(1, int(self.dispatchers * heavy_share))
+       self.max_deadline = max_deadline
+       self.max_queued = max_queued
+       self.backend = backend or create_job_backend()
+       self._running: Dict[str, asyncio.Task] = {}
+       self._heavy_running = 0
+       self._wakeup: Optional[asyncio.Event] = None
+       self._tasks: List[asyncio.Task] = []
+       self.completed = 0
+       self.failed = 0
+       self.timed_out = 0
+       self.cancelled = 0
+
+   def start(self) -> None:
+       self._wakeup = asyncio.Event()
+       self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.dispatchers)]
+       logger.info(f"Started job manager with {self.dispatchers} dispatchers ({self.heavy_limit} may run heavy jobs)")
+
+   async def stop(self) -> None:
+       for task in self._tasks + list(self._running.values()):
+           task.cancel()
+       await asyncio.gather(*self._tasks, *self._running.values(), return_exceptions=True)
+       self._tasks = []
+
+   def submit(self, work_type: str, difficulty: int, parameters: Dict[str, Any],
+              deadline: Optional[float] = None, result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+       """Queue a job, or record it as completed straight away when a result is already known"""
+       lane, rank = self.classify(work_type)
+       now = time.time()
+       job = {
+           "job_id": uuid.uuid4().hex,
+           "work_type": work_type,
+           "difficulty": difficulty,
+           "parameters": parameters,
+           "lane": lane,
+           "deadline_seconds": min(float(deadline), self.max_deadline) if deadline else self.max_deadline,
+           "status": "queued",
+           "submitted_at": now,
+           "started_at": None,
+           "finished_at": None,
+           "cancel_requested": False,
+           "result": None,
+           "error": None
+       }
+       if result is not None:
+           job.update(status="completed", started_at=now, finished_at=now, result=result)
+           self.backend.save(job)
+           return job
+
+       if self.backend.size(lane) >= self.max_queued:
+           raise JobQueueFull(f"The {lane} job queue holds {self.max_queued} jobs")
+       self.backend.save(job)
+       self.backend.push(lane, job["job_id"], job_score(rank, difficulty, self.backend.next_sequence()))
+       if self._wakeup is not None:
+           self._wakeup.set()
+       return job
+
+   def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+       return self.backend.load(job_id)
+
+   def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+       """Cancel a queued or running job; finished jobs are returned unchanged"""
+       job = self.backend.load(job_id)
+       if job is None or job["status"] in FINISHED_STATES:
+           return job
+       if job["status"] == "queued" and self.backend.remove(job["lane"], job_id):
+           self._finish(job, "cancelled", error="Cancelled before start")
+           return job
+       # Running, possibly in another process sharing the backend: flag it for its dispatcher
+       job["cancel_requested"] = True
+       self.backend.save(job)
+       task = self._running.get(job_id)
+       if task is not None:
+           task.cancel()
+       return job
+
+   def _finish(self, job: Dict[str, Any], status: str, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None) -> None:
+       job.update(status=status, finished_at=time.time(), result=result, error=error)
+       self.backend.save(job)
+       if status == "completed":
+           self.completed += 1
+       elif status == "timed_out":
+           self.timed_out += 1
+       elif status == "cancelled":
+           self.cancelled += 1
+       else:
+           self.failed += 1
+
+   def _next_job(self) -> Optional[Dict[str, Any]]:
+       """Highest priority light job, or a heavy one while heavy jobs are under their share"""
+       lanes = ["light"] + (["heavy"] if self._heavy_running < self.heavy_limit else [])
+       for lane in lanes:
+           while True:
+               job_id = self.backend.pop(lane)
+               if job_id is None:
+                   break
+               job = self.backend.load(job_id)
+               if job is not None and job["status"] == "queued":
+                   return job
+       return None
+
+   async def _dispatch(self) -> None:
+       while True:
+           job = self._next_job()
+           if job is None:
+               self._wakeup.clear()
+               try:
+                   # Other processes may enqueue into a shared backend, so poll as well
+                   await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+               except asyncio.TimeoutError:
+                   pass
+               continue
+           await self._run(job)
+           # Another dispatcher may be waiting for the heavy slot this job held
+           self._wakeup.set()
+
+   async def _run(self, job: Dict[str, Any]) -> None:
+       heavy = job["lane"] == "heavy"
+       self._heavy_running += heavy
+       job.update(status="running", started_at=time.time())
+       self.backend.save(job)
+       task = asyncio.create_task(self.runner(job["work_type"], job["difficulty"], job["parameters"], job["deadline_seconds"]))
+       self._running[job["job_id"]] = task
+       try:
+           while not task.done():
+               await asyncio.wait({task}, timeout=1.0)
+               record = self.backend.load(job["job_id"])
+               if record is not None and record.get("cancel_requested") and not task.done():
+                   task.cancel()
+           try:
+               self._finish(job, "completed", result=task.result())
+           except asyncio.CancelledError:
+               self._finish(job, "cancelled", error="Cancelled while running")
+           except ComputationTimeout:
+               self._finish(job, "timed_out", error=f"Exceeded deadline of {job['deadline_seconds']}s")
+           except Exception as e:
+               logger.error(f"Job {job['job_id']} ({job['work_type']}) failed: {e}")
+               self._finish(job, "failed", error=f"{type(e).__name__}: {e}")
+       finally:
+           self._running.pop(job["job_id"], None)
+           self._heavy_running -= heavy
+
+   def stats(self) -> Dict[str, Any]:
+       return {
+           "queued": {lane: self.backend.size(lane) for lane in LANES},
+           "running": len(self._running),
+           "heavy_running": self._heavy_running,
+           "heavy_limit": self.heavy_limit,
+           "dispatchers": self.dispatchers,
+           "completed": self.completed,
+           "failed": self.failed,
+           "timed_out": self.timed_out,
+           "cancelled": self.cancelled
+       }
@@ -0,0 +1,294 @@
+"""
+ProductiveMiner Lattice Reduction
+LLL and BKZ reduction of integer lattice bases, as used to attack
+lattice-based cryptography. The basis stays exact in int64 while its
+Gram-Schmidt orthogonalization is kept in floating point and updated one
+row at a time: each row is orthogonalized against the rows before it with
+a single triangular solve, so no rational numbers ever grow. BKZ improves
+an LLL-reduced basis block by block with Schnorr-Euchner enumeration.
+Bases are random q-ary lattices or Kannan embeddings of LWE instances.
+"""
+
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.linalg import solve_triangular
+
+from arithmetic import is_prime
+
+# Lovasz condition parameter
+LLL_DELTA = 0.99
+# A Gram-Schmidt coefficient counts as size-reduced below this (1/2 plus floating-point slack)
+ETA = 0.51
+# BKZ only accepts a block's shortest vector when it is this much shorter than the current first one
+BKZ_IMPROVEMENT = 0.999
+# Largest entries kept exactly: dot products of rows must stay exact in float64
+MAX_ENTRY_BITS = 20
+# Seconds LLL takes at dimension 200 on one core; its time grows about as d^2.6
+LLL_SECONDS_AT_200 = float(os.getenv('LLL_SECONDS_AT_200', 50))
+LLL_TIME_EXPONENT = 2.6
+
+class LatticeReduction:
+   """An integer basis (rows) with its floating-point Gram-Schmidt data: mu and squared norms r"""
+
+   def __init__(self, basis: np.ndarray):
+       self.basis = np.array(basis, dtype=np.int64)
+       # Float copy of the basis for dot products; exact while entries stay below MAX_ENTRY_BITS
+       self._floats = self.basis.astype(np.float64)
+       self.swaps = 0
+       self.size_reductions = 0
+       # Filled in row by row as LLL reaches each row
+       self.mu = np.eye(self.dimension)
+       self.r = np.zeros(self.dimension)
+
+   @property
+   def dimension(self) -> int:
+       return len(self.basis)
+
+   def _orthogonalize(self, k: int) -> None:
+       """Row k of mu and r[k], against rows 0..k-1 whose data is current"""
+       b = self._floats[k]
+       if k == 0:
+           self.r[0] = b @ b
+           return
+       dots = self._floats[:k] @ b
+       # a_j = <b_k, b*_j> r_j, from dots = L a with L the unit lower triangle of mu
+       a = solve_triangular(self.mu[:k, :k], dots, lower=True, unit_diagonal=True, check_finite=False)
+       self.mu[k, :k] = a / self.r[:k]
+       self.mu[k, k] = 1.0
+       self.r[k] = b @ b - a @ self.mu[k, :k]
+
+   def _size_reduce(self, k: int) -> None:
+       """Make |mu[k, j]| <= 1/2 for j < k by subtracting integer multiples of earlier rows"""
+       while np.any(np.abs(self.mu[k, :k]) > ETA):
+           # Nearest plane, last row first; the coefficients are applied to the basis in one product
+           m = self.mu[k, :k].copy()
+           coefficients = np.zeros(k, dtype=np.int64)
+           for j in range(k - 1, -1, -1):
+               c = round(m[j])
+               if c:
+                   coefficients[j] = c
+                   m[:j + 1] -= c * self.mu[j, :j + 1]
+           self.basis[k] -= coefficients @ self.basis[:k]
+           self._floats[k] = self.basis[k]
+           self.size_reductions += 1
+           # Recomputed from the exact basis, so rounding in m never accumulates
+           self._orthogonalize(k)
+
+   def lll(self, delta: float = LLL_DELTA, start: int = 0, deadline: Optional[float] = None) -> bool:
+       """LLL-reduce the rows, assuming rows before start already are; drops rows that become zero.
+
+       Returns False if the deadline passed first.
+       """
+       k = max(start, 1)
+       self._orthogonalize(0)
+       while k < self.dimension:
+           self._orthogonalize(k)
+           self._size_reduce(k)
+           if not self.basis[k].any():
+               # A dependent row reduced to zero
+               self.basis = np.delete(self.basis, k, axis=0)
+               self._floats = np.delete(self._floats, k, axis=0)
+               self.mu = np.delete(np.delete(self.mu, k, axis=0), k, axis=1)
+               self.r = np.delete(self.r, k)
+               continue
+           if self.r[k] >= (delta - self.mu[k, k - 1] ** 2) * self.r[k - 1]:
+               k += 1
+               continue
+           self.basis[[k - 1, k]] = self.basis[[k, k - 1]]
+           self._floats[[k - 1, k]] = self._floats[[k, k - 1]]
+           self.swaps += 1
+           k = max(k - 1, 1)
+           if k == 1:
+               self._orthogonalize(0)
+           if deadline and self.swaps % 256 == 0 and time.time() >= deadline:
+               return False
+       return True
+
+   def _enumerate(self, start: int, stop: int, radius: float, deadline: Optional[float] = None) -> Optional[np.ndarray]:
+       """Coefficients x of the shortest projection |pi_start(sum x_i b_i)|^2 < radius over rows start..stop-1.
+
+       Schnorr-Euchner enumeration: depth first from the last row, trying the
+       integers nearest each level's center first and shrinking the radius
+       whenever a shorter vector turns up. Once the deadline passes the
+       shortest vector found so far is returned.
+       """
+       n = stop - start
+       mu = self.mu[start:stop, start:stop].tolist()
+       r = self.r[start:stop].tolist()
+       x = [0] * n
+       best: List[Optional[List[int]]] = [None]
+       bound = [radius]
+       nodes, expired = [0], [False]
+
+       def search(i: int, partial: float, top: bool) -> None:
+           nodes[0] += 1
+           if deadline and nodes[0] % 4096 == 0 and time.time() >= deadline:
+               expired[0] = True
+           if expired[0]:
+               return
+           center = -sum(x[j] * mu[j][i] for j in range(i + 1, n))
+           nearest = round(center)
+           # Above the first non-zero coefficient only x_i >= 0 is tried: -v is as short as v
+           sides = [(nearest, 1)] if top else [(nearest, 1), (nearest - 1, -1)]
+           for value, direction in sides:
+               value = max(value, 0) if top else value
+               while True:
+                   length = partial + (value - center) ** 2 * r[i]
+                   if length >= bound[0]:
+                       break
+                   x[i] = value
+                   if i == 0:
+                       if value or not top:
+                           bound[0] = length
+                           best[0] = list(x)
+                   else:
+                       search(i - 1, length, top and value == 0)
+                       if expired[0]:
+                           return
+                   value += direction
+           x[i] = 0
+
+       search(n - 1, 0.0, True)
+       return None if best[0] is None else np.array(best[0], dtype=np.int64)
+
+   def bkz(self, block_size: int, max_tours: int = 8, deadline: Optional[float] = None) -> int:
+       """BKZ tours until one changes nothing; returns the number of tours run"""
+       tours = 0
+       while tours < max_tours:
+           tours += 1
+           changed = False
+           for k in range(self.dimension - 1):
+               if deadline and time.time() >= deadline:
+                   return tours
+               stop = min(k + block_size, self.dimension)
+               x = self._enumerate(k, stop, BKZ_IMPROVEMENT * self.r[k], deadline)
+               if x is None:
+                   continue
+               # Insert the vector and let LLL remove the dependency it creates; rows before k keep their data
+               mu, r = self.mu, self.r
+               self.basis = np.insert(self.basis, k, x @ self.basis[k:stop], axis=0)
+               self._floats = self.basis.astype(np.float64)
+               self.mu = np.zeros((self.dimension, self.dimension))
+               self.mu[:k, :k] = mu[:k, :k]
+               self.r = np.zeros(self.dimension)
+               self.r[:k] = r[:k]
+               self.lll(start=k)
+               changed = True
+           if not changed:
+               break
+       return tours
+
+   def log_determinant(self) -> float:
+       """Natural log of the lattice volume, from the Gram-Schmidt norms"""
+       return 0.5 * float(np.sum(np.log(self.r)))
+
+   def root_hermite_factor(self) -> float:
+       """delta_0 with |b_1| = delta_0^d vol^(1/d): about 1.0219 after LLL, less after BKZ"""
+       d = self.dimension
+       return math.exp((0.5 * math.log(float(self.r[0])) - self.log_determinant() / d) / d)
+
+   def shortest_vector(self) -> np.ndarray:
+       norms = np.einsum('ij,ij->i', self.basis.astype(np.float64), self.basis.astype(np.float64))
+       return self.basis[int(np.argmin(norms))]
+
+def dimension_for_budget(seconds: float) -> int:
+   """Largest dimension LLL is expected to finish within the given seconds"""
+   return int(200 * (max(seconds, 0.0) / LLL_SECONDS_AT_200) ** (1 / LLL_TIME_EXPONENT))
+
+def gaussian_heuristic(dimension: int, log_determinant: float) -> float:
+   """Expected length of the shortest vector of a random lattice with this volume"""
+   return math.sqrt(dimension / (2 * math.pi * math.e)) * math.exp(log_determinant / dimension)
+
+def next_prime(n: int) -> int:
+   while not is_prime(n):
+       n += 1
+   return n
+
+def q_ary_basis(dimension: int, rank: int, q: int, rng: np.random.Generator) -> np.ndarray:
+   """Basis of {A s mod q} for a random A in systematic form: rows [I_rank | X] above [0 | q I]"""
+   basis = np.zeros((dimension, dimension), dtype=np.int64)
+   basis[:rank, :rank] = np.eye(rank, dtype=np.int64)
+   basis[:rank, rank:] = rng.integers(0, q, size=(rank, dimension - rank))
+   basis[rank:, rank:] = q * np.eye(dimension - rank, dtype=np.int64)
+   return basis
+
+def lwe_embedding(samples: int, secret_dimension: int, q: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+   """Kannan's embedding of b = A s + e mod q with ternary s and e.
+
+   Returns the basis of dimension samples + 1, the secret and the error. The
+   lattice contains (e, 1), far shorter than its other vectors when the
+   instance is weak enough for reduction to find it.
+   """
+   x = rng.integers(0, q, size=(secret_dimension, samples - secret_dimension))
+   secret = rng.integers(-1, 2, size=secret_dimension)
+   error = rng.integers(-1, 2, size=samples)
+   # A = [I; X^T], so A s = (s, X^T s)
+   b = (np.concatenate([secret, secret @ x]) + error) % q
+   basis = np.zeros((samples + 1, samples + 1), dtype=np.int64)
+   basis[:samples, :samples] = q_ary_basis(samples, secret_dimension, q, rng)
+   basis[:secret_dimension, secret_dimension:samples] = x
+   basis[samples, :samples] = b
+   basis[samples, samples] = 1
+   return basis, secret, error
+
+def reduce_lattice(dimension: int, kind: str = "lwe", q: Optional[int] = None, block_size: int = 0,
+                   seed: int = 0, time_budget: Optional[float] = None) -> Dict[str, Any]:
+   """Build a q-ary or LWE lattice, LLL- and optionally BKZ-reduce it, and report what was found"""
+   rng = np.random.default_rng(seed)
+   q = next_prime(q or dimension * dimension)
+   if q.bit_length() > MAX_ENTRY_BITS:
+       raise ValueError(f"Modulus {q} exceeds {MAX_ENTRY_BITS} bits")
+   rank = max(1, dimension // 5)
+   if kind == "lwe":
+       basis, _, error = lwe_embedding(dimension - 1, rank, q, rng)
+   else:
+       basis, error = q_ary_basis(dimension, rank, q, rng), None
+
+   started = time.time()
+   deadline = started + time_budget if time_budget else None
+   reduction = LatticeReduction(basis)
+   completed = reduction.lll(deadline=deadline)
+   lll_seconds = time.time() - started
+   if not completed:
+       # An interrupted LLL leaves the rows after its position without Gram-Schmidt data
+       for k in range(reduction.dimension):
+           reduction._orthogonalize(k)
+   lll_hermite = reduction.root_hermite_factor()
+   tours = reduction.bkz(block_size, deadline=deadline) if block_size >= 2 and completed else 0
+   if deadline and time.time() >= deadline:
+       completed = False
+   elapsed = time.time() - started
+
+   shortest = reduction.shortest_vector()
+   log_det = reduction.log_determinant()
+   result = {
+       "kind": kind,
+       "dimension": dimension,
+       "modulus": q,
+       "rank": rank,
+       "completed": completed,
+       "root_hermite_factor": reduction.root_hermite_factor(),
+       "lll_root_hermite_factor": lll_hermite,
+       "shortest_vector": shortest.tolist(),
+       "shortest_norm": float(np.linalg.norm(shortest)),
+       "gaussian_heuristic": gaussian_heuristic(dimension, log_det),
+       "log_determinant": log_det,
+       "lll_swaps": reduction.swaps,
+       "size_reductions": reduction.size_reductions,
+       "bkz_block_size": block_size if tours else 0,
+       "bkz_tours": tours,
+       "lll_seconds": lll_seconds,
+       "elapsed_seconds": elapsed
+   }
+   if kind == "lwe":
+       # The embedded short vector is +-(e, 1); the secret follows from the first coordinates of b - e
+       target = np.concatenate([error, [1]])
+       found = any(np.array_equal(row, target) or np.array_equal(row, -target) for row in reduction.basis)
+       result["secret_dimension"] = rank
+       result["error_norm"] = float(np.linalg.norm(target))
+       result["secret_recovered"] = found
+   return result
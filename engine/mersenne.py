@@ -0,0 +1,177 @@
+"""
+ProductiveMiner Mersenne Prime Search
+Lucas-Lehmer testing of Mersenne numbers 2^p - 1. Candidates are first
+trial factored with divisors of the form 2kp + 1, survivors run the full
+Lucas-Lehmer test with shift-and-add reduction modulo 2^p - 1, and
+exponents are spread across a process pool.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Generator, Iterable, List, Optional
+
+import numpy as np
+
+from sieve import small_primes
+from streaming import drain
+
+logger = logging.getLogger(__name__)
+
+# Lucas-Lehmer processes across all concurrent searches; callers running several at once divide it
+MERSENNE_WORKERS = int(os.getenv('MERSENNE_WORKERS', os.cpu_count() or 1))
+# Exponents below this are cheaper to test inline than to ship to a pool
+PARALLEL_MIN_EXPONENT = 2000
+# Candidate k values per trial factoring batch
+_TRIAL_BATCH = 1 << 16
+_SMALL_PRIMES = [3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+
+def trial_factor_bits(p: int) -> int:
+   """How far to trial factor before Lucas-Lehmer: factors q < 2^bits"""
+   return min(max(p.bit_length() + 16, 24), 44)
+
+def trial_factor(p: int, max_bits: Optional[int] = None) -> Optional[int]:
+   """Smallest factor q = 2kp + 1 < 2^max_bits of 2^p - 1, if any.
+
+   Candidates are filtered in NumPy (q = +-1 mod 8, no small prime factors)
+   before the modular exponentiation 2^p mod q.
+   """
+   if max_bits is None:
+       max_bits = trial_factor_bits(p)
+   k_max = ((1 << max_bits) - 1) // (2 * p)
+   for k_lo in range(1, k_max + 1, _TRIAL_BATCH):
+       k = np.arange(k_lo, min(k_lo + _TRIAL_BATCH, k_max + 1), dtype=np.uint64)
+       q = np.uint64(2 * p) * k + np.uint64(1)
+       mod8 = q & np.uint64(7)
+       keep = (mod8 == 1) | (mod8 == 7)
+       for small in _SMALL_PRIMES:
+           keep &= (q % np.uint64(small) != 0) | (q == np.uint64(small))
+       for candidate in q[keep].tolist():
+           if candidate < (1 << p) - 1 and pow(2, p, candidate) == 1:
+               return candidate
+   return None
+
+def lucas_lehmer(p: int) -> bool:
+   """Lucas-Lehmer test: 2^p - 1 is prime iff s_(p-2) == 0 mod 2^p - 1"""
+   if p == 2:
+       return True
+   m = (1 << p) - 1
+   s = 4
+   for _ in range(p - 2):
+       s = s * s - 2
+       # x mod 2^p - 1 == (x & m) + (x >> p), applied once more if needed
+       s = (s & m) + (s >> p)
+       if s >= m:
+           s -= m
+   return s == 0
+
+def test_exponent(p: int) -> Dict[str, Any]:
+   """Trial factor, then Lucas-Lehmer, for the Mersenne number 2^p - 1 (p prime)"""
+   started = time.time()
+   factor = trial_factor(p) if p > 2 else None
+   if factor is not None:
+       return {"exponent": p, "prime": False, "factor": factor, "method": "trial_factoring",
+               "seconds": time.time() - started}
+   return {"exponent": p, "prime": lucas_lehmer(p), "factor": None, "method": "lucas_lehmer",
+           "seconds": time.time() - started}
+
+def prime_exponents(start: int, end: int) -> List[int]:
+   """Prime exponents p in [start, end]"""
+   return [p for p in small_primes(end) if p >= start]
+
+def _register_worker(pids) -> None:
+   """Pool initializer: report the worker's PID so an abandoned search can kill it"""
+   pids.put(os.getpid())
+
+def _kill_workers(pids) -> None:
+   while not pids.empty():
+       try:
+           os.kill(pids.get(), getattr(signal, 'SIGKILL', signal.SIGTERM))
+       except (ProcessLookupError, PermissionError):
+           pass
+
+def iter_search_mersenne_primes(exponents: Iterable[int], workers: int = MERSENNE_WORKERS,
+                                time_budget: Optional[float] = None) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+   """Test every exponent, largest first across a process pool, yielding progress as each one finishes"""
+   started = time.time()
+   deadline = started + time_budget if time_budget else None
+   exponents = sorted(set(exponents), reverse=True)
+   results: List[Dict[str, Any]] = []
+   pending: List[int] = []
+
+   def progress(result: Dict[str, Any]) -> Dict[str, Any]:
+       results.append(result)
+       return {"exponents_tested": len(results), "exponents_total": len(exponents), "last_exponent": result["exponent"],
+               "mersenne_exponents": sorted(r["exponent"] for r in results if r["prime"])}
+
+   heavy = [p for p in exponents if p >= PARALLEL_MIN_EXPONENT]
+   light = [p for p in exponents if p < PARALLEL_MIN_EXPONENT]
+   if heavy and workers > 1:
+       ctx = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+       pids = ctx.SimpleQueue()
+       pool = ProcessPoolExecutor(max_workers=min(workers, len(heavy)), mp_context=ctx,
+                                  initializer=_register_worker, initargs=(pids,))
+       finished = False
+       try:
+           futures = {pool.submit(test_exponent, p): p for p in heavy}
+           remaining = set(futures)
+           while remaining:
+               timeout = max(0.0, deadline - time.time()) if deadline else None
+               done, remaining = wait(remaining, timeout=timeout, return_when=FIRST_COMPLETED)
+               for future in done:
+                   yield progress(future.result())
+               if deadline and time.time() >= deadline:
+                   pending.extend(futures[f] for f in remaining)
+                   break
+           finished = not pending
+       finally:
+           pool.shutdown(wait=finished, cancel_futures=True)
+           if not finished:
+               # Abandon in-flight Lucas-Lehmer runs that overran the budget or were cancelled
+               _kill_workers(pids)
+           pids.close()
+   else:
+       light = heavy + light
+
+   for p in light:
+       if deadline and time.time() >= deadline:
+           pending.append(p)
+           continue
+       yield progress(test_exponent(p))
+
+   if pending:
+       logger.warning(f"Mersenne search budget exhausted with {len(pending)} exponents untested")
+   results.sort(key=lambda r: r["exponent"])
+   primes = [r["exponent"] for r in results if r["prime"]]
+   return {
+       "exponents_tested": len(results),
+       "mersenne_exponents": primes,
+       "eliminated_by_trial_factoring": sum(1 for r in results if r["method"] == "trial_factoring"),
+       "lucas_lehmer_tests": sum(1 for r in results if r["method"] == "lucas_lehmer"),
+       "exponents_pending": sorted(pending),
+       "results": results,
+       "elapsed_seconds": time.time() - started
+   }
+
+def search_mersenne_primes(exponents: Iterable[int], workers: int = MERSENNE_WORKERS,
+                           time_budget: Optional[float] = None) -> Dict[str, Any]:
+   """Test every exponent, largest first across a process pool, within an optional time budget"""
+   return drain(iter_search_mersenne_primes(exponents, workers, time_budget))
+
+def number_summary(value: int) -> Dict[str, Any]:
+   """Compact description of a possibly huge integer"""
+   # Estimate from the bit length, then correct; str() is quadratic and capped for huge ints
+   digits = max(1, int((value.bit_length() - 1) * 0.30102999566398120))
+   while value >= 10 ** digits:
+       digits += 1
+   summary = {"digits": digits, "last_digits": str(value % 10**12)}
+   if value.bit_length() <= 64:
+       summary["value"] = value
+   return summary
+
+def perfect_number(p: int) -> int:
+   """Even perfect number 2^(p-1) * (2^p - 1) for a Mersenne prime exponent p"""
+   return (1 << (p - 1)) * ((1 << p) - 1)
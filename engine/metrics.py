@@ -0,0 +1,163 @@
+"""
+ProductiveMiner Metrics
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format. Series are keyed by their label values and updated only from the
+event loop thread, so recording a sample is a dictionary update without
+locks; gauges that mirror other components are sampled at scrape time.
+"""
+
+import bisect
+import math
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds, spanning cache hits to the longest allowed computations
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# Upper bounds of the difficulty label values
+DIFFICULTY_BUCKETS = (10, 25, 50, 100)
+
+def difficulty_bucket(difficulty: int) -> str:
+   """Coarse difficulty label, keeping the number of series bounded"""
+   lower = 1
+   for upper in DIFFICULTY_BUCKETS:
+       if difficulty <= upper:
+           return f"{lower}-{upper}"
+       lower = upper + 1
+   return f"{lower}+"
+
+def _format_value(value: float) -> str:
+   if value == math.inf:
+       return "+Inf"
+   if isinstance(value, int) or float(value).is_integer():
+       return str(int(value))
+   return repr(float(value))
+
+def _escape(value: str) -> str:
+   return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+   pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+   if extra:
+       pairs.append(extra)
+   return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+   kind = "untyped"
+
+   def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+       self.name = name
+       self.documentation = documentation
+       self.labelnames = tuple(labelnames)
+
+   def samples(self) -> Iterable[str]:
+       return ()
+
+   def render(self) -> List[str]:
+       return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+class Counter(Metric):
+   kind = "counter"
+
+   def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+       super().__init__(name, documentation, labelnames)
+       self._values: Dict[Tuple[str, ...], float] = {}
+
+   def inc(self, *labels: str, amount: float = 1) -> None:
+       self._values[labels] = self._values.get(labels, 0) + amount
+
+   def samples(self) -> Iterable[str]:
+       for labels, value in sorted(self._values.items()):
+           yield f"{self.name}{_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class Histogram(Metric):
+   kind = "histogram"
+
+   def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                buckets: Sequence[float] = LATENCY_BUCKETS):
+       super().__init__(name, documentation, labelnames)
+       self.buckets = tuple(sorted(buckets))
+       # Per series: count in each bucket (not cumulative, the last one is +Inf), then the sum
+       self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+   def observe(self, value: float, *labels: str) -> None:
+       series = self._series.get(labels)
+       if series is None:
+           series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+       series[bisect.bisect_left(self.buckets, value)] += 1
+       series[-1] += value
+
+   def samples(self) -> Iterable[str]:
+       for labels, series in sorted(self._series.items()):
+           cumulative = 0
+           for bound, count in zip(self.buckets + (math.inf,), series):
+               cumulative += count
+               le = f'le="{_format_value(bound)}"'
+               yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+           yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+           yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+class Sampled(Metric):
+   """Value read from a callback at scrape time: a number, or {label values: number}.
+
+   Gauges, and counters kept by another component such as the result cache.
+   """
+
+   def __init__(self, name: str, documentation: str, read: Callable[[], object], labelnames: Sequence[str] = (),
+                kind: str = "gauge"):
+       super().__init__(name, documentation, labelnames)
+       self.read = read
+       self.kind = kind
+
+   def samples(self) -> Iterable[str]:
+       value = self.read()
+       if value is None:
+           return
+       series = value if isinstance(value, dict) else {(): value}
+       for labels, sample in sorted(series.items()):
+           if sample is None:
+               continue
+           labels = labels if isinstance(labels, tuple) else (labels,)
+           yield f"{self.name}{_labels(self.labelnames, labels)} {_format_value(sample)}"
+
+class Registry:
+   def __init__(self, namespace: str = "productiveminer"):
+       self.namespace = namespace
+       self._metrics: List[Metric] = []
+
+   def _register(self, metric: Metric) -> Metric:
+       self._metrics.append(metric)
+       return metric
+
+   def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+       return self._register(Counter(f"{self.namespace}_{name}", documentation, labelnames))
+
+   def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+       return self._register(Histogram(f"{self.namespace}_{name}", documentation, labelnames, buckets))
+
+   def gauge(self, name: str, documentation: str, read: Callable[[], object], labelnames: Sequence[str] = ()) -> Sampled:
+       return self._register(Sampled(f"{self.namespace}_{name}", documentation, read, labelnames))
+
+   def counter_from(self, name: str, documentation: str, read: Callable[[], object],
+                    labelnames: Sequence[str] = ()) -> Sampled:
+       """Counter whose running total is kept elsewhere and read at scrape time"""
+       return self._register(Sampled(f"{self.namespace}_{name}", documentation, read, labelnames, kind="counter"))
+
+   def render(self) -> str:
+       lines: List[str] = []
+       for metric in self._metrics:
+           lines.extend(metric.render())
+       return "\n".join(lines) + "\n"
+
+def process_rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+   """Resident set size of a process (Linux), None where /proc is unavailable"""
+   try:
+       with open(f"/proc/{pid or os.getpid()}/status") as f:
+           for line in f:
+               if line.startswith("VmRSS:"):
+                   return int(line.split()[1]) * 1024
+   except (OSError, ValueError):
+       pass
+   return None
@@ -0,0 +1,322 @@
+"""
+ProductiveMiner Navier-Stokes Solver
+Pseudo-spectral solver for incompressible flow in the periodic box
+[0, 2pi)^d, d = 2 or 3. The velocity is kept as real-to-complex Fourier
+coefficients; the nonlinear term is evaluated in rotational form u x omega
+on the grid, dealiased by the 2/3 rule and projected onto divergence-free
+fields, and the solution is advanced by classical fourth-order Runge-Kutta.
+Every array the time loop touches is allocated once up front. Transforms go
+through scipy.fft, which caches its plans per transform size (NumPy's FFT
+rebuilds them on every call), and write straight into the preallocated
+arrays.
+"""
+
+import math
+import os
+import time
+from typing import Any, Dict, Generator, List, Optional
+
+import numpy as np
+import scipy.fft
+
+try:
+   # scipy.fft's pocketfft bindings, which unlike the public functions accept an output array
+   from scipy.fft._pocketfft.pypocketfft import c2r, r2c
+except ImportError:
+   c2r = r2c = None
+
+# Courant number of the advective time step limit
+CFL = 0.5
+# Diffusive stability limit of RK4: dt <= VISCOUS_LIMIT / (nu k_max^2)
+VISCOUS_LIMIT = 2.5
+# Steps between progress reports
+PROGRESS_STEPS = 10
+# Reynolds numbers (rms velocity, unit length) separating the reported flow regimes
+TRANSITIONAL_REYNOLDS = 100.0
+TURBULENT_REYNOLDS = 1000.0
+# Threads per transform; the engine already runs one solver per pool worker
+FFT_WORKERS = int(os.getenv('FFT_WORKERS', 1))
+
+def grid_for_difficulty(difficulty: int, dimensions: int) -> int:
+   """Points per side: doubles every 25 difficulty levels, from 32 (2D) or 16 (3D)"""
+   return (32 if dimensions == 2 else 16) << (difficulty // 25)
+
+def default_viscosity(n: int) -> float:
+   """Smallest viscosity that resolves the Kolmogorov scale (k_max eta ~ 1) for unit velocity"""
+   return (n / 3) ** (-4 / 3)
+
+def work_memory_mb(n: int, dimensions: int) -> float:
+   """Memory held by a solver's work arrays"""
+   real = n ** dimensions * 8
+   spectral = n ** (dimensions - 1) * (n // 2 + 1) * 16
+   vorticity = 1 if dimensions == 2 else 3
+   # Work arrays, plus pocketfft's internal copy of a velocity-sized transform
+   return (real * (3 * dimensions + vorticity + 1) + spectral * (6 * dimensions + vorticity + 3)) / 2**20
+
+def fft_flops(n: int, dimensions: int) -> float:
+   """Conventional operation count of one real FFT over the grid, 2.5 N log2 N"""
+   points = n ** dimensions
+   return 2.5 * points * math.log2(points)
+
+class SpectralSolver:
+   """Incompressible Navier-Stokes on an n^d periodic grid"""
+
+   def __init__(self, n: int, dimensions: int = 2, viscosity: Optional[float] = None):
+       if dimensions not in (2, 3):
+           raise ValueError(f"Only 2D and 3D flows are supported, not {dimensions}D")
+       self.n = n
+       self.dimensions = dimensions
+       self.viscosity = default_viscosity(n) if viscosity is None else viscosity
+       self.shape = (n,) * dimensions
+       self.axes = tuple(range(1, dimensions + 1))
+       self.time = 0.0
+       self.steps = 0
+       self.transforms = 0
+
+       # Wavenumbers, broadcastable against the (n, ..., n // 2 + 1) spectral grid
+       full = np.fft.fftfreq(n, 1.0 / n)
+       half = np.fft.rfftfreq(n, 1.0 / n)
+       self.k = np.meshgrid(*([full] * (dimensions - 1) + [half]), indexing='ij', sparse=True)
+       self.k2 = sum(k * k for k in self.k)
+       self.k2_safe = np.where(self.k2 == 0, 1, self.k2)
+       self.k_max = n // 2
+       # 2/3 rule: drop modes a quadratic product would alias back onto the retained ones
+       self.dealias = np.ones(self.k2.shape, dtype=bool)
+       for k in self.k:
+           self.dealias = self.dealias & (np.abs(k) < n / 3)
+       # Real-to-complex transforms store one half of the spectrum; the other half is its conjugate
+       self.weights = np.where((half == 0) | (half == n // 2), 1.0, 2.0) * np.ones(self.k2.shape)
+       self.shells = np.rint(np.sqrt(self.k2)).astype(np.int64).ravel()
+
+       spectral = (dimensions,) + self.k2.shape
+       vorticity = 1 if dimensions == 2 else 3
+       self.u_hat = np.zeros(spectral, dtype=np.complex128)
+       self._u0 = np.empty_like(self.u_hat)
+       self._sum = np.empty_like(self.u_hat)
+       self._du = np.empty_like(self.u_hat)
+       self._work = np.empty_like(self.u_hat)
+       self._omega_hat = np.empty((vorticity,) + self.k2.shape, dtype=np.complex128)
+       self._u = np.empty((dimensions,) + self.shape)
+       self._omega = np.empty((vorticity,) + self.shape)
+       self._cross = np.empty((dimensions,) + self.shape)
+       self._scratch = np.empty(self.shape)
+       self._divergence = np.empty(self.k2.shape, dtype=np.complex128)
+       self._product = np.empty(self.k2.shape, dtype=np.complex128)
+
+   def _forward(self, physical: np.ndarray, out: np.ndarray) -> None:
+       if r2c is not None:
+           r2c(physical, axes=self.axes, forward=True, inorm=0, out=out, nthreads=FFT_WORKERS)
+       else:
+           out[...] = scipy.fft.rfftn(physical, axes=self.axes, workers=FFT_WORKERS)
+       self.transforms += physical.shape[0]
+
+   def _inverse(self, spectral: np.ndarray, out: np.ndarray) -> None:
+       """Leaves spectral intact; the multi-axis c2r transforms a private copy"""
+       if c2r is not None:
+           c2r(spectral, axes=self.axes, lastsize=self.n, forward=False, inorm=2, out=out, nthreads=FFT_WORKERS)
+       else:
+           out[...] = scipy.fft.irfftn(spectral, s=self.shape, axes=self.axes, workers=FFT_WORKERS)
+       self.transforms += spectral.shape[0]
+
+   def set_velocity(self, u: np.ndarray) -> None:
+       """Start from a velocity field of shape (d, n, ..., n), made divergence-free"""
+       self._forward(u, self.u_hat)
+       self._project(self.u_hat)
+       self.u_hat *= self.dealias
+
+   def taylor_green(self) -> None:
+       """Taylor-Green vortex: a decaying exact solution in 2D, a transition to turbulence in 3D"""
+       x = np.meshgrid(*([np.arange(self.n) * (2 * np.pi / self.n)] * self.dimensions), indexing='ij', sparse=True)
+       u = np.zeros((self.dimensions,) + self.shape)
+       if self.dimensions == 2:
+           u[0] = np.sin(x[0]) * np.cos(x[1])
+           u[1] = -np.cos(x[0]) * np.sin(x[1])
+       else:
+           u[0] = np.sin(x[0]) * np.cos(x[1]) * np.cos(x[2])
+           u[1] = -np.cos(x[0]) * np.sin(x[1]) * np.cos(x[2])
+       self.set_velocity(u)
+
+   def random_field(self, seed: int, peak_wavenumber: float = 4.0) -> None:
+       """Random phases under the spectrum E(k) ~ k^4 exp(-2 (k / k_peak)^2), normalized to unit rms velocity"""
+       rng = np.random.default_rng(seed)
+       k = np.sqrt(self.k2)
+       amplitude = np.sqrt(k ** 4 * np.exp(-2 * (k / peak_wavenumber) ** 2) / np.maximum(k, 1) ** (self.dimensions - 1))
+       phases = np.exp(2j * np.pi * rng.random(self.u_hat.shape))
+       self.u_hat[...] = amplitude * phases * self.dealias
+       self.u_hat[(slice(None),) + (0,) * self.dimensions] = 0
+       self._project(self.u_hat)
+       # Round trip through the grid restores the Hermitian symmetry random phases break
+       self._inverse(self.u_hat, self._u)
+       self._u /= math.sqrt(2 * self.energy_of(self._u))
+       self._forward(self._u, self.u_hat)
+
+   @staticmethod
+   def energy_of(u: np.ndarray) -> float:
+       return 0.5 * float(np.mean(np.sum(u * u, axis=0)))
+
+   def _project(self, field: np.ndarray) -> None:
+       """Remove the gradient part of field in place: f - k (k . f) / |k|^2"""
+       self._divergence[...] = 0
+       for i, k in enumerate(self.k):
+           np.multiply(k, field[i], out=self._product)
+           self._divergence += self._product
+       self._divergence /= self.k2_safe
+       for i, k in enumerate(self.k):
+           np.multiply(k, self._divergence, out=self._product)
+           field[i] -= self._product
+
+   def _curl(self, u_hat: np.ndarray) -> None:
+       """Vorticity i k x u_hat into the spectral vorticity array"""
+       k, w = self.k, self._omega_hat
+       if self.dimensions == 2:
+           np.multiply(k[0], u_hat[1], out=w[0])
+           np.multiply(k[1], u_hat[0], out=self._product)
+           w[0] -= self._product
+       else:
+           for i, (a, b) in enumerate(((1, 2), (2, 0), (0, 1))):
+               np.multiply(k[a], u_hat[b], out=w[i])
+               np.multiply(k[b], u_hat[a], out=self._product)
+               w[i] -= self._product
+       w *= 1j
+
+   def _rhs(self, u_hat: np.ndarray, out: np.ndarray) -> float:
+       """du_hat/dt into out; returns the largest velocity component on the grid"""
+       u, omega, cross = self._u, self._omega, self._cross
+       self._inverse(u_hat, u)
+       u_max = max(float(u.max()), -float(u.min()))
+       self._curl(u_hat)
+       self._inverse(self._omega_hat, omega)
+       if self.dimensions == 2:
+           np.multiply(u[1], omega[0], out=cross[0])
+           np.multiply(u[0], omega[0], out=cross[1])
+           np.negative(cross[1], out=cross[1])
+       else:
+           for i, (a, b) in enumerate(((1, 2), (2, 0), (0, 1))):
+               np.multiply(u[a], omega[b], out=cross[i])
+               np.multiply(u[b], omega[a], out=self._scratch)
+               cross[i] -= self._scratch
+       self._forward(cross, out)
+       out *= self.dealias
+       # The pressure (with |u|^2 / 2) is whatever gradient keeps the flow divergence-free
+       self._project(out)
+       np.multiply(u_hat, self.k2, out=self._work)
+       self._work *= self.viscosity
+       out -= self._work
+       return u_max
+
+   def time_step(self, u_max: float) -> float:
+       dx = 2 * np.pi / self.n
+       advective = CFL * dx / u_max if u_max > 0 else math.inf
+       viscous = VISCOUS_LIMIT / (self.viscosity * self.k_max ** 2) if self.viscosity > 0 else math.inf
+       return min(advective, viscous, 1.0)
+
+   def step(self) -> float:
+       """One RK4 step with an adaptive time step; returns the step taken"""
+       np.copyto(self._u0, self.u_hat)
+       np.copyto(self._sum, self.u_hat)
+       dt = None
+       for a, b in ((0.5, 1 / 6), (0.5, 1 / 3), (1.0, 1 / 3), (None, 1 / 6)):
+           u_max = self._rhs(self.u_hat, self._du)
+           if dt is None:
+               dt = self.time_step(u_max)
+           self._du *= dt
+           np.multiply(self._du, b, out=self._work)
+           self._sum += self._work
+           if a is not None:
+               np.multiply(self._du, a, out=self.u_hat)
+               self.u_hat += self._u0
+       np.copyto(self.u_hat, self._sum)
+       self.time += dt
+       self.steps += 1
+       return dt
+
+   def _mode_energy(self, field: np.ndarray) -> np.ndarray:
+       """Energy per Fourier mode of a spectral field, summed over components"""
+       scale = 0.5 / float(self.n ** self.dimensions) ** 2
+       return np.sum(field.real ** 2 + field.imag ** 2, axis=0) * self.weights * scale
+
+   def energy(self) -> float:
+       return float(self._mode_energy(self.u_hat).sum())
+
+   def enstrophy(self) -> float:
+       """Half the mean squared vorticity"""
+       return float((self._mode_energy(self.u_hat) * self.k2).sum())
+
+   def energy_spectrum(self) -> List[float]:
+       """Shell-summed energy E(k) for integer |k| up to the dealiasing cutoff"""
+       spectrum = np.bincount(self.shells, weights=self._mode_energy(self.u_hat).ravel())
+       return spectrum[:int(self.n / 3) + 1].tolist()
+
+   def velocity_rms(self) -> List[float]:
+       self._inverse(self.u_hat, self._u)
+       return [float(np.sqrt(np.mean(c * c))) for c in self._u]
+
+   def pressure_gradient_rms(self) -> float:
+       """rms |grad p|, from the pressure Poisson equation -lap p = d_i d_j (u_i u_j)"""
+       self._inverse(self.u_hat, self._u)
+       p_hat, term = self._divergence, self._product
+       p_hat[...] = 0
+       for i in range(self.dimensions):
+           for j in range(i, self.dimensions):
+               np.multiply(self._u[i], self._u[j], out=self._scratch)
+               self._forward(self._scratch[np.newaxis], term[np.newaxis])
+               term *= self.k[i] * self.k[j] * (1 if i == j else 2)
+               p_hat -= term
+       p_hat *= self.dealias
+       p_hat /= self.k2_safe
+       gradient = self._work
+       for i, k in enumerate(self.k):
+           np.multiply(k, p_hat, out=gradient[i])
+       gradient *= 1j
+       return math.sqrt(2 * float(self._mode_energy(gradient).sum()))
+
+def flow_regime(reynolds: float) -> str:
+   if reynolds < TRANSITIONAL_REYNOLDS:
+       return "laminar"
+   return "transitional" if reynolds < TURBULENT_REYNOLDS else "turbulent"
+
+def iter_simulate(n: int, dimensions: int, steps: int, viscosity: Optional[float] = None, initial: str = "taylor-green",
+                 seed: int = 0, time_budget: Optional[float] = None) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+   """Run the solver for a number of steps, yielding energy and enstrophy every PROGRESS_STEPS"""
+   solver = SpectralSolver(n, dimensions, viscosity)
+   if initial == "random":
+       solver.random_field(seed)
+   else:
+       solver.taylor_green()
+   initial_energy, initial_enstrophy = solver.energy(), solver.enstrophy()
+
+   started = time.time()
+   deadline = started + time_budget if time_budget else None
+   while solver.steps < steps:
+       if deadline and time.time() >= deadline:
+           break
+       solver.step()
+       if solver.steps % PROGRESS_STEPS == 0:
+           yield {"steps": solver.steps, "steps_total": steps, "time": solver.time,
+                  "energy": solver.energy(), "enstrophy": solver.enstrophy()}
+   elapsed = time.time() - started
+   transforms = solver.transforms
+
+   velocity = solver.velocity_rms()
+   u_rms = math.sqrt(sum(v * v for v in velocity) / dimensions)
+   enstrophy = solver.enstrophy()
+   return {
+       "grid": [n] * dimensions,
+       "viscosity": solver.viscosity,
+       "initial_condition": initial,
+       "steps": solver.steps,
+       "steps_requested": steps,
+       "simulated_time": solver.time,
+       "velocity_rms": velocity,
+       "reynolds_number": u_rms / solver.viscosity if solver.viscosity > 0 else math.inf,
+       "energy": solver.energy(),
+       "initial_energy": initial_energy,
+       "enstrophy": enstrophy,
+       "initial_enstrophy": initial_enstrophy,
+       "dissipation_rate": 2 * solver.viscosity * enstrophy,
+       "energy_spectrum": solver.energy_spectrum(),
+       "pressure_gradient_rms": solver.pressure_gradient_rms(),
+       "elapsed_seconds": elapsed,
+       "steps_per_second": solver.steps / elapsed if elapsed > 0 else 0.0,
+       "fft_gflops": transforms * fft_flops(n, dimensions) / elapsed / 1e9 if elapsed > 0 else 0.0
+   }
@@ -0,0 +1,171 @@
+"""
+ProductiveMiner Pascal Triangle
+Rows of Pascal's triangle without the triangle. Rows are streamed one at a
+time, each built from the previous one, or computed directly through the
+multiplicative recurrence C(n, k + 1) = C(n, k) (n - k) / (k + 1). Residues
+modulo a prime p come from Lucas' theorem, digit by digit in base p over
+the whole row at once, and p-adic valuations from Kummer's theorem. Counts
+of entries prime to p, the Sierpinski triangle for p = 2, follow from the
+base-p digits of the row index alone.
+"""
+
+import math
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from arithmetic import is_prime
+from mersenne import number_summary
+from prime_store import get_prime_store
+
+# Largest prime for modular views: products of two residues must fit in int64
+MAX_LUCAS_PRIME = (1 << 31) - 1
+
+def binomial_row(n: int) -> List[int]:
+   """Row n exactly, from the multiplicative recurrence and its symmetry"""
+   row = [1] * (n + 1)
+   c = 1
+   for k in range(n // 2):
+       c = c * (n - k) // (k + 1)
+       row[k + 1] = row[n - k - 1] = c
+   return row
+
+def iter_rows(start: int, stop: int, modulus: Optional[int] = None) -> Iterator[Union[List[int], np.ndarray]]:
+   """Rows start, ..., stop - 1, each built from the one before, so only one row is held.
+
+   Exact rows are lists of ints; with a modulus below 2^62 they are int64 arrays of residues.
+   """
+   if start >= stop:
+       return
+   if modulus is None:
+       row = binomial_row(start)
+       yield row
+       for _ in range(start + 1, stop):
+           row = [1] + [a + b for a, b in zip(row, row[1:])] + [1]
+           yield row
+       return
+   lucas = modulus <= MAX_LUCAS_PRIME and is_prime(modulus)
+   row = row_mod_prime(start, modulus) if lucas else np.array([c % modulus for c in binomial_row(start)], dtype=np.int64)
+   yield row
+   for _ in range(start + 1, stop):
+       following = np.empty(len(row) + 1, dtype=np.int64)
+       following[0] = following[-1] = 1 % modulus
+       np.remainder(row[:-1] + row[1:], modulus, out=following[1:-1])
+       row = following
+       yield row
+
+def base_digits(n: int, p: int) -> List[int]:
+   """Base-p digits of n, least significant first"""
+   digits = []
+   while n:
+       n, d = divmod(n, p)
+       digits.append(d)
+   return digits
+
+def row_mod_prime(n: int, p: int) -> np.ndarray:
+   """C(n, k) mod p for k = 0..n by Lucas' theorem: the product of C(n_i, k_i) over base-p digits"""
+   k = np.arange(n + 1, dtype=np.int64)
+   if p == 2:
+       # C(n, k) is odd exactly when the bits of k are a subset of those of n
+       return ((k & n) == k).astype(np.int64)
+   # Factorials mod p, as far as the largest digit of n needs them
+   top = max(base_digits(n, p), default=0)
+   factorial = [1] * (top + 1)
+   for i in range(1, top + 1):
+       factorial[i] = factorial[i - 1] * i % p
+   inverse = [1] * (top + 1)
+   inverse[top] = pow(factorial[top], p - 2, p)
+   for i in range(top, 0, -1):
+       inverse[i - 1] = inverse[i] * i % p
+   factorial, inverse = np.array(factorial, dtype=np.int64), np.array(inverse, dtype=np.int64)
+
+   result = np.ones(n + 1, dtype=np.int64)
+   for d in base_digits(n, p):
+       digit = k % p
+       k //= p
+       inside = digit <= d
+       clipped = np.where(inside, digit, 0)
+       term = factorial[d] * inverse[clipped] % p * inverse[d - clipped] % p
+       result = np.where(inside, result * term % p, 0)
+   return result
+
+def _digit_sums(values: np.ndarray, p: int) -> np.ndarray:
+   sums = np.zeros_like(values)
+   values = values.copy()
+   while values.any():
+       sums += values % p
+       values //= p
+   return sums
+
+def row_valuations(n: int, p: int) -> np.ndarray:
+   """v_p(C(n, k)) for k = 0..n: the carries adding k and n - k in base p (Kummer)"""
+   k = np.arange(n + 1, dtype=np.int64)
+   return (_digit_sums(k, p) + _digit_sums(n - k, p) - sum(base_digits(n, p))) // (p - 1)
+
+def nonzero_count(n: int, p: int) -> int:
+   """Entries of row n not divisible by p: the product of (n_i + 1) over base-p digits (Fine)"""
+   return math.prod(d + 1 for d in base_digits(n, p))
+
+def nonzero_total(rows: int, p: int) -> int:
+   """Entries not divisible by p in rows 0..rows - 1; p(p + 1)/2 per digit for each full block of rows"""
+   block = p * (p + 1) // 2
+   total, prefix = 0, 1
+   digits = base_digits(rows, p)
+   for i in range(len(digits) - 1, -1, -1):
+       d = digits[i]
+       # Rows sharing the higher digits, with a smaller digit here and any digits below
+       total += prefix * (d * (d + 1) // 2) * block ** i
+       prefix *= d + 1
+   return total
+
+def row_statistics(n: int, p: int) -> Dict[str, Any]:
+   """Divisibility of row n by p, from its Lucas residues and Kummer valuations"""
+   residues = row_mod_prime(n, p)
+   valuations = row_valuations(n, p)
+   values, counts = np.unique(valuations, return_counts=True)
+   nonzero = int(np.count_nonzero(residues))
+   return {
+       "row": n,
+       "prime": p,
+       "entries": n + 1,
+       "not_divisible": nonzero,
+       "divisible": n + 1 - nonzero,
+       "valuation_counts": {str(v): int(c) for v, c in zip(values.tolist(), counts.tolist())},
+       "max_valuation": int(values[-1])
+   }
+
+def _factorial_valuations(n: int, primes: np.ndarray) -> np.ndarray:
+   """v_p(n!) for every p in primes, by Legendre's formula"""
+   total = np.zeros(len(primes), dtype=np.int64)
+   power = primes.astype(np.int64)
+   while (power <= n).any():
+       total += n // power
+       # Powers past n stop contributing; capping them keeps the products in range
+       power = np.minimum(power, n + 1) * primes
+   return total
+
+def binomial_summary(n: int, k: int) -> Dict[str, Any]:
+   """Digit count and last digits of C(n, k), from its prime factorization rather than its value"""
+   primes = get_prime_store().primes_up_to(n).astype(np.int64)
+   exponents = _factorial_valuations(n, primes) - _factorial_valuations(k, primes) - _factorial_valuations(n - k, primes)
+   present = exponents > 0
+   primes, exponents = primes[present].tolist(), exponents[present].tolist()
+   log10 = math.fsum(e * math.log10(p) for p, e in zip(primes, exponents))
+   if log10 < 19:
+       return number_summary(math.comb(n, k))
+   last = 1
+   for p, e in zip(primes, exponents):
+       last = last * pow(p, e, 10**12) % 10**12
+   return {"digits": int(log10) + 1, "last_digits": str(last)}
+
+def sierpinski_density(rows: int, p: int = 2) -> Dict[str, Any]:
+   """Share of entries in the first rows not divisible by p; tends to 0 as rows grow"""
+   entries = rows * (rows + 1) // 2
+   nonzero = nonzero_total(rows, p)
+   return {
+       "rows": rows,
+       "prime": p,
+       "entries": entries,
+       "not_divisible": nonzero,
+       "density": nonzero / entries if entries else 0.0
+   }
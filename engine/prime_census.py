@@ -0,0 +1,100 @@
+"""
+ProductiveMiner Prime Census
+Vectorized statistics over sieve output: twin prime counts per decade,
+partial sums of Brun's constant and the full prime gap histogram, all
+gathered in a single streaming pass over the segmented sieve.
+"""
+
+import math
+from typing import Any, Dict, Generator
+
+import numpy as np
+
+from sieve import iter_prime_segments
+from streaming import drain
+
+_POWERS_OF_TEN = np.array([10**k for k in range(19)], dtype=np.int64)
+
+def prime_gap_statistics(primes: np.ndarray) -> Dict[str, Any]:
+   """Gap statistics of a sorted prime array, computed with np.diff"""
+   gaps = np.diff(primes)
+   histogram = np.bincount(gaps) if len(gaps) else np.zeros(0, dtype=np.int64)
+   return {
+       "total_primes": len(primes),
+       "average_gap": int(gaps.sum()) / len(gaps) if len(gaps) else 0,
+       "max_gap": int(gaps.max()) if len(gaps) else 0,
+       "min_gap": int(gaps.min()) if len(gaps) else 0,
+       "gap_histogram": {int(g): int(c) for g, c in enumerate(histogram) if c}
+   }
+
+def iter_twin_prime_census(lo: int, hi: int) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+   """Census of the primes in [lo, hi]: twin pairs per decade, Brun partial sums and gaps.
+
+   Twin pairs (p, p + 2) are counted when both members lie in the range. The
+   range is streamed segment by segment with the last prime carried over, so
+   pairs and gaps that straddle a segment boundary are not lost.
+   """
+   decades = np.zeros(len(_POWERS_OF_TEN), dtype=np.int64)
+   brun_by_decade = np.zeros(len(_POWERS_OF_TEN), dtype=np.float64)
+   gap_histogram = np.zeros(0, dtype=np.int64)
+   total_primes = 0
+   twin_total = 0
+   first_pairs = []
+   max_gap = {"gap": 0, "after": None}
+   previous = np.empty(0, dtype=np.int64)
+
+   for segment in iter_prime_segments(lo, hi + 1):
+       total_primes += len(segment)
+       primes = np.concatenate((previous, segment))
+       if len(primes) < 2:
+           previous = primes[-1:]
+           continue
+
+       gaps = np.diff(primes)
+       counts = np.bincount(gaps)
+       if len(counts) > len(gap_histogram):
+           counts[:len(gap_histogram)] += gap_histogram
+           gap_histogram = counts
+       else:
+           gap_histogram[:len(counts)] += counts
+
+       i = int(np.argmax(gaps))
+       if int(gaps[i]) > max_gap["gap"]:
+           max_gap = {"gap": int(gaps[i]), "after": int(primes[i])}
+
+       twins = primes[:-1][gaps == 2]
+       if len(twins):
+           twin_total += len(twins)
+           decade = np.searchsorted(_POWERS_OF_TEN, twins, side='right') - 1
+           decades += np.bincount(decade, minlength=len(decades))
+           contribution = 1.0 / twins + 1.0 / (twins + 2)
+           brun_by_decade += np.bincount(decade, weights=contribution, minlength=len(decades))
+           first_pairs.extend((int(p), int(p) + 2) for p in twins[:10 - len(first_pairs)])
+
+       previous = primes[-1:]
+       yield {"primes_so_far": total_primes, "twin_pairs": twin_total, "checked_through": int(segment[-1]) if len(segment) else None}
+
+   per_decade = []
+   brun_partial = 0.0
+   for k in np.flatnonzero(decades).tolist():
+       brun_partial += float(brun_by_decade[k])
+       per_decade.append({
+           "decade": f"[10^{k}, 10^{k + 1})",
+           "twin_pairs": int(decades[k]),
+           "brun_partial_sum": brun_partial
+       })
+
+   return {
+       "range": [lo, hi],
+       "total_primes": total_primes,
+       "twin_pairs": twin_total,
+       "first_twin_pairs": first_pairs,
+       "twin_pairs_per_decade": per_decade,
+       "brun_partial_sum": math.fsum(brun_by_decade.tolist()),
+       "max_gap": max_gap,
+       "gap_histogram": {int(g): int(c) for g, c in enumerate(gap_histogram) if c}
+   }
+
+def twin_prime_census(lo: int, hi: int) -> Dict[str, Any]:
+   """Census of the primes in [lo, hi]: twin pairs per decade, Brun partial sums and gaps"""
+   return drain(iter_twin_prime_census(lo, hi))
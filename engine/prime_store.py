@@ -0,0 +1,145 @@
+"""
+ProductiveMiner Prime Store
+Persistent, memory-mapped table of primes shared by all engine processes.
+The table lives in a single .npy file that is grown on demand and replaced
+atomically, so readers in other processes always see a complete table.
+"""
+
+import fcntl
+import glob
+import logging
+import os
+import re
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from sieve import prime_count, primes_up_to as sieve_primes
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.getenv('ENGINE_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+PRIME_STORE_DIR = os.getenv('PRIME_STORE_DIR', os.path.join(DATA_DIR, 'primes'))
+PRIME_STORE_MIN_LIMIT = int(os.getenv('PRIME_STORE_MIN_LIMIT', 10**6))
+PRIME_STORE_MAX_LIMIT = int(os.getenv('PRIME_STORE_MAX_LIMIT', 2 * 10**9))
+
+_TABLE_PATTERN = re.compile(r'primes_(\d+)\.npy$')
+
+class PrimeStore:
+   """Read-only view of the shared prime table, grown on demand"""
+
+   def __init__(self, directory: str = PRIME_STORE_DIR,
+                min_limit: int = PRIME_STORE_MIN_LIMIT,
+                max_limit: int = PRIME_STORE_MAX_LIMIT):
+       self.directory = directory
+       self.min_limit = min_limit
+       self.max_limit = max_limit
+       self.limit = 1
+       self.primes = np.empty(0, dtype=np.int64)
+       self._persistent = True
+       try:
+           os.makedirs(directory, exist_ok=True)
+       except OSError as e:
+           logger.warning(f"Prime store directory {directory} is not writable, using memory only: {e}")
+           self._persistent = False
+       self._reload()
+
+   def _latest_table(self) -> Optional[tuple]:
+       best = None
+       for path in glob.glob(os.path.join(self.directory, 'primes_*.npy')):
+           match = _TABLE_PATTERN.search(path)
+           if match and (best is None or int(match.group(1)) > best[0]):
+               best = (int(match.group(1)), path)
+       return best
+
+   def _reload(self) -> None:
+       """Map the largest table on disk if it is bigger than the current one"""
+       if not self._persistent:
+           return
+       latest = self._latest_table()
+       if latest and latest[0] > self.limit:
+           try:
+               self.primes = np.load(latest[1], mmap_mode='r')
+               self.limit = latest[0]
+           except (OSError, ValueError) as e:
+               logger.warning(f"Could not map prime table {latest[1]}: {e}")
+
+   def _grow(self, n: int) -> None:
+       target = min(max(n, 2 * self.limit, self.min_limit), self.max_limit)
+       if not self._persistent:
+           self.primes = sieve_primes(target)
+           self.limit = target
+           return
+
+       with open(os.path.join(self.directory, 'primes.lock'), 'w') as lock:
+           fcntl.flock(lock, fcntl.LOCK_EX)
+           # Another process may have grown the table while we waited
+           self._reload()
+           if self.limit >= n:
+               return
+
+           primes = sieve_primes(target)
+           path = os.path.join(self.directory, f'primes_{target}.npy')
+           tmp_path = f'{path}.{os.getpid()}.tmp'
+           try:
+               with open(tmp_path, 'wb') as f:
+                   np.save(f, primes)
+               os.replace(tmp_path, path)
+           except OSError as e:
+               logger.warning(f"Could not persist prime table up to {target}: {e}")
+               self.primes = primes
+               self.limit = target
+               return
+
+           # Readers keep their existing mappings alive after the unlink
+           for old in glob.glob(os.path.join(self.directory, 'primes_*.npy')):
+               if old != path:
+                   try:
+                       os.remove(old)
+                   except OSError:
+                       pass
+           logger.info(f"Prime store grown to {target} ({len(primes)} primes)")
+
+       self._reload()
+
+   def ensure(self, n: int) -> None:
+       """Make sure the table covers every prime <= n"""
+       if n <= self.limit:
+           return
+       self._reload()
+       if n > self.limit and n <= self.max_limit:
+           self._grow(n)
+
+   def primes_up_to(self, n: int) -> np.ndarray:
+       """Zero-copy view of all primes <= n"""
+       if n > self.max_limit:
+           # Too large to persist, sieve just for this request
+           return sieve_primes(n)
+       self.ensure(n)
+       return self.primes[:int(np.searchsorted(self.primes, n, side='right'))]
+
+   def prime_count(self, x: int) -> int:
+       """pi(x), the number of primes <= x"""
+       if x > self.max_limit:
+           # Count straight from the packed sieve without building the list
+           return prime_count(x)
+       return len(self.primes_up_to(x))
+
+   def stats(self) -> Dict[str, Any]:
+       """Size of the mapped table, picking up tables grown by other processes"""
+       self._reload()
+       return {
+           "limit": self.limit,
+           "primes": len(self.primes),
+           "bytes": int(self.primes.nbytes),
+           "persistent": self._persistent
+       }
+
+_store: Optional[PrimeStore] = None
+
+def get_prime_store() -> PrimeStore:
+   """Process-wide prime store instance"""
+   global _store
+   if _store is None:
+       _store = PrimeStore()
+   return _store
@@ -0,0 +1,110 @@
+"""
+ProductiveMiner Profiling
+Opt-in statistical profiling of single computations. A sampler thread
+records the computing thread's Python stack at a fixed interval while the
+handler runs; stacks are kept in collapsed form ("a;b;c count"), ready for
+flame graph tools, in a bounded in-memory ring buffer. Nothing is sampled
+unless a request asks for it or falls into the sampled share of requests.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Request header that turns profiling on for one computation
+PROFILE_HEADER = "X-Profile"
+# Percentage of computations profiled without being asked
+PROFILE_SAMPLE_PERCENT = float(os.getenv('PROFILE_SAMPLE_PERCENT', 0))
+# Seconds between stack samples
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))
+# Profiles kept; the oldest is dropped first
+PROFILE_BUFFER_SIZE = int(os.getenv('PROFILE_BUFFER_SIZE', 64))
+
+def should_profile(header: Optional[str], sample_percent: float = PROFILE_SAMPLE_PERCENT) -> bool:
+   """Profile when the request header asks for it, or for a random share of requests"""
+   if header is not None:
+       return header.strip().lower() not in ("", "0", "false", "no", "off")
+   return sample_percent > 0 and random.random() * 100 < sample_percent
+
+def _frame_name(frame) -> str:
+   code = frame.f_code
+   return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+class StackSampler:
+   """Samples one thread's stack from a background thread, counting collapsed stacks"""
+
+   def __init__(self, interval: float = PROFILE_INTERVAL):
+       self.interval = interval
+       self.stacks: Counter = Counter()
+       self.samples = 0
+       self._stop = threading.Event()
+       self._thread: Optional[threading.Thread] = None
+
+   def start(self) -> None:
+       # Frames at and below the caller belong to the worker loop, not the computation
+       root = sys._getframe(1)
+       target = threading.get_ident()
+       self._thread = threading.Thread(target=self._run, args=(target, root), name="profile-sampler", daemon=True)
+       self._thread.start()
+
+   def stop(self) -> None:
+       self._stop.set()
+       if self._thread is not None:
+           self._thread.join()
+
+   def _run(self, target: int, root) -> None:
+       while not self._stop.wait(self.interval):
+           frame = sys._current_frames().get(target)
+           stack = []
+           while frame is not None and frame is not root:
+               stack.append(_frame_name(frame))
+               frame = frame.f_back
+           if stack:
+               self.stacks[";".join(reversed(stack))] += 1
+               self.samples += 1
+
+   def collapsed(self) -> str:
+       return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def profiled(fn: Callable, *args) -> Tuple[Any, Dict[str, Any]]:
+   """Call fn(*args) under the stack sampler; returns its value and the profile"""
+   sampler = StackSampler()
+   started = time.time()
+   sampler.start()
+   try:
+       value = fn(*args)
+   finally:
+       sampler.stop()
+   return value, {
+       "created_at": started,
+       "seconds": time.time() - started,
+       "interval": sampler.interval,
+       "samples": sampler.samples,
+       "collapsed": sampler.collapsed()
+   }
+
+class ProfileStore:
+   """Ring buffer of the most recent profiles, by id"""
+
+   def __init__(self, size: int = PROFILE_BUFFER_SIZE):
+       self.size = max(1, size)
+       self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+   def add(self, profile: Dict[str, Any]) -> str:
+       profile_id = uuid.uuid4().hex
+       self._profiles[profile_id] = {"profile_id": profile_id, **profile}
+       while len(self._profiles) > self.size:
+           self._profiles.popitem(last=False)
+       return profile_id
+
+   def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+       return self._profiles.get(profile_id)
+
+   def list(self) -> List[Dict[str, Any]]:
+       """Newest first, without the stacks"""
+       return [{k: v for k, v in profile.items() if k != "collapsed"} for profile in reversed(self._profiles.values())]
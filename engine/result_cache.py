@@ -0,0 +1,228 @@
+"""
+ProductiveMiner Result Cache
+Content-addressed cache for computation results. Keys are SHA-256 digests
+of the canonical JSON form of (work_type, difficulty, parameters, engine
+version); results live in a size-bounded in-process LRU tier with a TTL,
+backed by a local on-disk tier shared by every process on the host. The
+disk tier is bounded too: when a write takes it over its limit, expired
+files and then the least recently written ones are removed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from prime_store import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_MB = int(os.getenv('RESULT_CACHE_MB', 64))
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 3600))
+# Empty string disables the disk tier
+RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR', os.path.join(DATA_DIR, 'results'))
+RESULT_CACHE_DISK_MB = int(os.getenv('RESULT_CACHE_DISK_MB', 512))
+# An eviction pass brings the disk tier down to this share of its limit, so passes stay rare
+_DISK_LOW_WATERMARK = 0.9
+
+def _json_default(value: Any) -> Any:
+   """Encode NumPy scalars and arrays that slip into results"""
+   if isinstance(value, np.generic):
+       return value.item()
+   if isinstance(value, np.ndarray):
+       return value.tolist()
+   raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def canonical_json(value: Any) -> str:
+   """Deterministic JSON: sorted keys, no whitespace"""
+   return json.dumps(value, sort_keys=True, separators=(',', ':'), default=_json_default)
+
+def cache_key(work_type: str, difficulty: int, parameters: Dict[str, Any], version: str) -> str:
+   """Digest identifying a computation independently of process and parameter order"""
+   payload = canonical_json([work_type, difficulty, parameters, version])
+   return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResultCache:
+   """Two-tier result cache: LRU memory tier with TTL, then on-disk JSON files"""
+
+   def __init__(self, max_bytes: int = RESULT_CACHE_MB << 20, ttl: float = RESULT_CACHE_TTL,
+                directory: Optional[str] = RESULT_CACHE_DIR, max_disk_bytes: int = RESULT_CACHE_DISK_MB << 20):
+       self.max_bytes = max_bytes
+       self.max_disk_bytes = max_disk_bytes
+       self.ttl = ttl
+       self.directory = directory or None
+       self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+       self._bytes = 0
+       # Bytes on disk as of the last scan plus this process's writes since; None until first scanned
+       self._disk_bytes: Optional[int] = None
+       self._lock = threading.Lock()
+       self.memory_hits = 0
+       self.disk_hits = 0
+       self.misses = 0
+       self.evictions = 0
+       self.expirations = 0
+       self.disk_evictions = 0
+
+   def _path(self, key: str) -> str:
+       return os.path.join(self.directory, key[:2], f'{key}.json')
+
+   def get(self, key: str) -> Optional[Any]:
+       now = time.time()
+       with self._lock:
+           entry = self._entries.get(key)
+           if entry is not None:
+               expires_at, size, value = entry
+               if expires_at > now:
+                   self._entries.move_to_end(key)
+                   self.memory_hits += 1
+                   return value
+               self._remove(key)
+               self.expirations += 1
+
+       value, expires_at, size = self._read_disk(key, now)
+       with self._lock:
+           if value is None:
+               self.misses += 1
+               return None
+           self.disk_hits += 1
+           self._insert(key, expires_at, size, value)
+       return value
+
+   def put(self, key: str, value: Any) -> None:
+       try:
+           data = canonical_json(value)
+       except (TypeError, ValueError) as e:
+           logger.warning(f"Result for {key} is not cacheable: {e}")
+           return
+       expires_at = time.time() + self.ttl
+       with self._lock:
+           self._insert(key, expires_at, len(data), value)
+       self._write_disk(key, expires_at, data)
+
+   def _insert(self, key: str, expires_at: float, size: int, value: Any) -> None:
+       if size > self.max_bytes:
+           return
+       if key in self._entries:
+           self._remove(key)
+       self._entries[key] = (expires_at, size, value)
+       self._bytes += size
+       while self._bytes > self.max_bytes:
+           oldest = next(iter(self._entries))
+           self._remove(oldest)
+           self.evictions += 1
+
+   def _remove(self, key: str) -> None:
+       _, size, _ = self._entries.pop(key)
+       self._bytes -= size
+
+   def _read_disk(self, key: str, now: float) -> Tuple[Optional[Any], float, int]:
+       if not self.directory:
+           return None, 0.0, 0
+       path = self._path(key)
+       try:
+           with open(path) as f:
+               data = f.read()
+           record = json.loads(data)
+       except (OSError, ValueError):
+           return None, 0.0, 0
+       if record.get("expires_at", 0) <= now:
+           self.expirations += 1
+           try:
+               os.remove(path)
+           except OSError:
+               pass
+           return None, 0.0, 0
+       return record.get("result"), record["expires_at"], len(data)
+
+   def _write_disk(self, key: str, expires_at: float, data: str) -> None:
+       if not self.directory:
+           return
+       path = self._path(key)
+       tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+       record = f'{{"expires_at":{expires_at!r},"result":{data}}}'
+       if len(record) > self.max_disk_bytes:
+           return
+       try:
+           os.makedirs(os.path.dirname(path), exist_ok=True)
+           with open(tmp_path, 'w') as f:
+               f.write(record)
+           os.replace(tmp_path, path)
+       except OSError as e:
+           logger.warning(f"Could not write cached result {key}: {e}")
+           return
+       with self._lock:
+           if self._disk_bytes is not None:
+               self._disk_bytes += len(record)
+           over = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+       if over:
+           self._evict_disk()
+
+   def _scan_disk(self) -> list:
+       """(mtime, size, path) of every cached file"""
+       files = []
+       for root, _, names in os.walk(self.directory):
+           for name in names:
+               path = os.path.join(root, name)
+               try:
+                   stat = os.stat(path)
+               except OSError:
+                   continue
+               files.append((stat.st_mtime, stat.st_size, path))
+       return files
+
+   def _evict_disk(self) -> None:
+       """Remove expired files and, if the disk tier is over its limit, the oldest by mtime"""
+       files = self._scan_disk()
+       total = sum(size for _, size, _ in files)
+       now = time.time()
+       target = _DISK_LOW_WATERMARK * self.max_disk_bytes if total > self.max_disk_bytes else total
+       # Every file expires ttl after it was written, so the oldest files are the expired ones
+       for mtime, size, path in sorted(files):
+           if total <= target and mtime + self.ttl > now:
+               break
+           try:
+               os.remove(path)
+           except OSError:
+               continue
+           total -= size
+           if mtime + self.ttl <= now:
+               self.expirations += 1
+           else:
+               self.disk_evictions += 1
+       with self._lock:
+           self._disk_bytes = total
+
+   def clear(self) -> None:
+       """Drop every entry from both tiers"""
+       with self._lock:
+           self._entries.clear()
+           self._bytes = 0
+           self._disk_bytes = None
+       if self.directory and os.path.isdir(self.directory):
+           for root, _, files in os.walk(self.directory):
+               for name in files:
+                   try:
+                       os.remove(os.path.join(root, name))
+                   except OSError:
+                       pass
+
+   def stats(self) -> Dict[str, Any]:
+       return {
+           "entries": len(self._entries),
+           "bytes": self._bytes,
+           "max_bytes": self.max_bytes,
+           "ttl_seconds": self.ttl,
+           "memory_hits": self.memory_hits,
+           "disk_hits": self.disk_hits,
+           "misses": self.misses,
+           "evictions": self.evictions,
+           "disk_evictions": self.disk_evictions,
+           "expirations": self.expirations,
+           "disk_tier": self.directory is not None
+       }
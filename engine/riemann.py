@@ -0,0 +1,193 @@
+"""
+ProductiveMiner Riemann Zero Finder
+Locates zeros of the Riemann zeta function on the critical line with a
+vectorized Riemann-Siegel evaluation of Z(t). Gram points bracket the
+zeros, each Gram interval is sampled a few times to catch violations of
+Gram's law, and every sign change is refined with a vectorized Illinois
+(modified regula falsi) iteration.
+"""
+
+import math
+import time
+from typing import Any, Dict, Generator, Tuple
+
+import numpy as np
+from scipy.special import lambertw
+
+from streaming import drain
+
+# Coefficients of the Riemann-Siegel remainder terms C0 and C1 (Gabcke) in powers of z = 1 - 2p
+RS_C0 = np.array([
+   0.38268343236508977173, 0.43724046807752044936, 0.13237657548034352332,
+   -0.01360502604767418865, -0.01356762197010358089, -0.00162372532314446528,
+   0.00029705353733379691, 0.00007943300879521470, 0.00000046556124614505,
+   -0.00000143272516309551, -0.00000010354847112313, 0.00000001235792708386,
+   0.00000000178810838580, -0.00000000003391414390, -0.00000000001632663390
+])
+RS_C1 = np.array([
+   -0.02682510262837534703, 0.01378477342635185305, 0.03849125048223508223,
+   0.00987106629906207647, -0.00331075976085840433, -0.00146478085779541508,
+   -0.00001320794062487696, 0.00005922748701847141, 0.00000598024258537345,
+   -0.00000096413224561698, -0.00000018334733722714
+])
+# C2 = Psi''(p) / (64 pi^2) + Psi^(6)(p) / (18432 pi^4), fitted in powers of z^2
+RS_C2 = np.array([
+   0.005188542830291991, 0.0003094658391413156, -0.011335941093967234,
+   0.002233046030606775, 0.005196634685800619, 0.0003440065035445908,
+   -0.0005911171780846001, -0.00010218175334061189, 2.071539406421921e-05,
+   6.0871163838248495e-06, -2.465762188900235e-07, -1.3763363423478922e-07
+])
+
+# Heights and block sizes searched: the Riemann-Siegel sum has sqrt(t / 2pi) terms,
+# about 4e5 at the top, and a block costs several evaluations per zero
+MIN_ZERO_HEIGHT = 10.0
+MAX_ZERO_HEIGHT = 1e12
+MAX_ZERO_COUNT = 10000
+# Samples of Z per Gram interval; more samples catch more Gram-law violations
+SAMPLES_PER_GRAM = 4
+# Upper bound on the (t values x main-sum terms) matrix evaluated at once
+_MAX_TERMS = 1 << 22
+
+def theta(t: np.ndarray) -> np.ndarray:
+   """Riemann-Siegel theta function (asymptotic expansion)"""
+   t = np.asarray(t, dtype=np.float64)
+   return (t / 2 * np.log(t / (2 * np.pi)) - t / 2 - np.pi / 8
+           + 1 / (48 * t) + 7 / (5760 * t**3) + 31 / (80640 * t**5))
+
+def riemann_siegel_z(t: np.ndarray) -> np.ndarray:
+   """Hardy's Z(t) for an array of heights t > ~10, evaluated all at once"""
+   t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+   tau = t / (2 * np.pi)
+   n_terms = np.floor(np.sqrt(tau)).astype(np.int64)
+   result = np.empty(len(t))
+
+   n_max = int(n_terms.max()) if len(t) else 0
+   n = np.arange(1, n_max + 1, dtype=np.float64)
+   log_n = np.log(n)
+   inv_sqrt_n = 1 / np.sqrt(n)
+   th = theta(t)
+   rows = max(1, _MAX_TERMS // max(n_max, 1))
+   for lo in range(0, len(t), rows):
+       hi = min(lo + rows, len(t))
+       phase = th[lo:hi, None] - t[lo:hi, None] * log_n
+       terms = np.cos(phase) * inv_sqrt_n
+       terms[n[None, :] > n_terms[lo:hi, None]] = 0.0
+       result[lo:hi] = 2 * terms.sum(axis=1)
+
+   p = np.sqrt(tau) - n_terms
+   z2 = (1 - 2 * p) ** 2
+   c0 = np.polyval(RS_C0[::-1], z2)
+   c1 = (1 - 2 * p) * np.polyval(RS_C1[::-1], z2)
+   c2 = np.polyval(RS_C2[::-1], z2)
+   sign = np.where(n_terms % 2 == 1, 1.0, -1.0)  # (-1)^(N-1)
+   result += sign * tau**-0.25 * (c0 - c1 / np.sqrt(tau) + c2 / tau)
+   return result
+
+def sign_changes_at(gammas: np.ndarray) -> np.ndarray:
+   """Whether Z changes sign close to each gamma, i.e. gamma is a zero to within the accuracy of Z.
+
+   The window shrinks like the Riemann-Siegel truncation error, t^(-7/4), down to 1e-6.
+   """
+   gammas = np.asarray(gammas, dtype=np.float64)
+   delta = np.maximum(gammas ** -1.75, 1e-6)
+   z = riemann_siegel_z(np.concatenate((gammas - delta, gammas + delta)))
+   return z[:len(gammas)] * z[len(gammas):] < 0
+
+def gram_points(first: int, last: int) -> np.ndarray:
+   """Gram points g_n, theta(g_n) = n*pi, for first <= n <= last (n >= -1)"""
+   n = np.arange(first, last + 1, dtype=np.float64)
+   x = (n + 0.125) / math.e
+   t = 2 * np.pi * (n + 0.125) / lambertw(x).real
+   for _ in range(4):
+       t -= (theta(t) - n * np.pi) / (0.5 * np.log(t / (2 * np.pi)))
+   return t
+
+def _refine(a: np.ndarray, b: np.ndarray, fa: np.ndarray, fb: np.ndarray,
+            tol: float = 1e-10, max_iterations: int = 60) -> Tuple[np.ndarray, int]:
+   """Illinois iteration on many sign-change brackets at once"""
+   evaluations = 0
+   active = np.arange(len(a))
+   c = (a + b) / 2
+   for _ in range(max_iterations):
+       if not len(active):
+           break
+       aa, bb, ffa, ffb = a[active], b[active], fa[active], fb[active]
+       cc = (aa * ffb - bb * ffa) / (ffb - ffa)
+       fc = riemann_siegel_z(cc)
+       evaluations += len(cc)
+       c[active] = cc
+
+       crossed = fc * ffb < 0
+       # Sign change between c and b: the old b becomes a
+       a[active] = np.where(crossed, bb, aa)
+       fa[active] = np.where(crossed, ffb, ffa / 2)
+       b[active], fb[active] = cc, fc
+
+       done = (np.abs(b[active] - a[active]) < tol) | (fc == 0)
+       active = active[~done]
+   return c, evaluations
+
+def iter_find_zeros(t_start: float, count: int) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+   """Find the first `count` zeros with gamma >= t_start, yielding progress after each Gram block.
+
+   t_start is clamped to [MIN_ZERO_HEIGHT, MAX_ZERO_HEIGHT] and count to MAX_ZERO_COUNT.
+   """
+   began = time.time()
+   t_start = min(max(float(t_start), MIN_ZERO_HEIGHT), MAX_ZERO_HEIGHT)
+   count = min(int(count), MAX_ZERO_COUNT)
+   gram_index = max(-1, int(math.floor(theta(t_start) / np.pi)))
+   zeros = []
+   evaluations = 0
+   gram_intervals = 0
+   violations = 0
+   t_prev, z_prev = t_start, float(riemann_siegel_z(t_start)[0])
+
+   while len(zeros) < count:
+       block = max(16, int((count - len(zeros)) * 1.1))
+       gram = gram_points(gram_index + 1, gram_index + block)
+       gram_index += block
+
+       # Sample each Gram interval, starting from the last point of the previous block
+       edges = np.concatenate(([t_prev], gram[gram > t_prev]))
+       steps = np.linspace(0, 1, SAMPLES_PER_GRAM, endpoint=False)[1:]
+       inner = edges[:-1, None] + np.diff(edges)[:, None] * steps
+       grid = np.sort(np.concatenate((edges[1:], inner.ravel())))
+       z = riemann_siegel_z(grid)
+       evaluations += len(grid)
+
+       ts = np.concatenate(([t_prev], grid))
+       zs = np.concatenate(([z_prev], z))
+       change = np.flatnonzero(zs[:-1] * zs[1:] < 0)
+       roots, refine_evaluations = _refine(ts[change].copy(), ts[change + 1].copy(),
+                                           zs[change].copy(), zs[change + 1].copy())
+       evaluations += refine_evaluations
+       zeros.extend(roots.tolist())
+
+       # Gram's law: one zero per Gram interval
+       per_interval = np.bincount(np.searchsorted(edges, roots, side='right') - 1, minlength=len(edges) - 1)
+       gram_intervals += len(per_interval)
+       violations += int(np.count_nonzero(per_interval != 1))
+       t_prev, z_prev = float(ts[-1]), float(zs[-1])
+       yield {"zeros_found": min(len(zeros), count), "t_reached": t_prev, "z_evaluations": evaluations}
+
+   zeros = zeros[:count]
+   elapsed = time.time() - began
+   return {
+       "t_start": t_start,
+       "t_end": zeros[-1] if zeros else t_start,
+       "zeros": zeros,
+       "gram_intervals": gram_intervals,
+       "gram_law_violations": violations,
+       "z_evaluations": evaluations,
+       "main_sum_terms": int(math.sqrt(zeros[-1] / (2 * math.pi))) if zeros else 0,
+       "elapsed_seconds": elapsed,
+       "zeros_per_second": len(zeros) / elapsed if elapsed > 0 else 0.0
+   }
+
+def find_zeros(t_start: float, count: int) -> Dict[str, Any]:
+   """Find the first `count` zeros 1/2 + i*gamma with gamma >= t_start"""
+   return drain(iter_find_zeros(t_start, count))
+
+def zero_block_for_difficulty(difficulty: int) -> Tuple[float, int]:
+   """Default starting height and zero count for a difficulty level"""
+   return 10.0 ** (1 + difficulty / 20), 10 * difficulty
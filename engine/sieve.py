@@ -0,0 +1,204 @@
+"""
+ProductiveMiner Sieve Kernels
+Vectorized, bit-packed Sieve of Eratosthenes. Only odd numbers (or, with
+the 2·3·5 wheel, only numbers coprime to 30) are stored, one bit each,
+and the sieve is run segment by segment so the working set stays small.
+"""
+
+import math
+from typing import Iterator, List
+
+import numpy as np
+
+# Odd numbers sieved per segment (kept a multiple of 8 so segments pack to whole bytes)
+SEGMENT_SIZE = 1 << 21
+
+# Residues coprime to 30, one bit plane per residue
+WHEEL_MODULUS = 30
+WHEEL_RESIDUES = np.array([1, 7, 11, 13, 17, 19, 23, 29], dtype=np.int64)
+_WHEEL_INDEX = {int(r): k for k, r in enumerate(WHEEL_RESIDUES)}
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+_CHUNK_BYTES = 1 << 20
+
+def small_primes(n: int) -> List[int]:
+   """Plain sieve for small bounds such as sqrt(n) base primes"""
+   if n < 2:
+       return []
+   is_prime = np.ones(n + 1, dtype=bool)
+   is_prime[:2] = False
+   for i in range(2, math.isqrt(n) + 1):
+       if is_prime[i]:
+           is_prime[i * i::i] = False
+   return np.flatnonzero(is_prime).tolist()
+
+class SieveBits:
+   """Packed sieve output: bit k of byte j says whether the number at that slot is prime"""
+
+   def __init__(self, n: int, bits: np.ndarray, layout: str):
+       self.n = n
+       self.bits = bits
+       self.layout = layout
+
+   @property
+   def nbytes(self) -> int:
+       return self.bits.nbytes
+
+   def _small(self) -> List[int]:
+       extra = [2] if self.layout == 'odd' else [2, 3, 5]
+       return [p for p in extra if p <= self.n]
+
+   def _slot_values(self, start_byte: int, flat: np.ndarray) -> np.ndarray:
+       if self.layout == 'odd':
+           return (start_byte * 8 + flat) * 2 + 1
+       return (start_byte + flat // 8) * WHEEL_MODULUS + WHEEL_RESIDUES[flat % 8]
+
+   def count(self) -> int:
+       """pi(n) straight from the bit counts, without building the prime list"""
+       total = 0
+       for start in range(0, len(self.bits), _CHUNK_BYTES):
+           total += int(_POPCOUNT[self.bits[start:start + _CHUNK_BYTES]].sum(dtype=np.int64))
+       return total + len(self._small())
+
+   def is_prime(self, x: int) -> bool:
+       if x > self.n or x < 2:
+           return False
+       if self.layout == 'odd':
+           if x % 2 == 0:
+               return x == 2
+           slot = x // 2
+           return bool(self.bits[slot >> 3] >> (slot & 7) & 1)
+       k = _WHEEL_INDEX.get(x % WHEEL_MODULUS)
+       if k is None:
+           return x in (2, 3, 5)
+       return bool(self.bits[x // WHEEL_MODULUS] >> k & 1)
+
+   def to_array(self) -> np.ndarray:
+       """All primes <= n as a sorted int64 array"""
+       parts = [np.array(self._small(), dtype=np.int64)]
+       for start in range(0, len(self.bits), _CHUNK_BYTES):
+           chunk = np.unpackbits(self.bits[start:start + _CHUNK_BYTES], bitorder='little')
+           parts.append(self._slot_values(start, np.flatnonzero(chunk)))
+       return np.concatenate(parts)
+
+def _sieve_odd(n: int) -> np.ndarray:
+   """Bits for odd numbers: slot i stands for 2i + 1"""
+   size = (n + 1) // 2
+   bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+   base = small_primes(math.isqrt(n))[1:]
+   segment = np.empty(SEGMENT_SIZE, dtype=bool)
+
+   for lo in range(0, size, SEGMENT_SIZE):
+       hi = min(lo + SEGMENT_SIZE, size)
+       seg = segment[:hi - lo]
+       seg[:] = True
+       if lo == 0:
+           seg[0] = False  # 1 is not prime
+       for p in base:
+           start = (p * p) // 2
+           if start >= hi:
+               break
+           if start < lo:
+               start += -(-(lo - start) // p) * p
+           seg[start - lo::p] = False
+       packed = np.packbits(seg, bitorder='little')
+       bits[lo // 8:lo // 8 + len(packed)] = packed
+
+   return bits
+
+def _sieve_wheel(n: int) -> np.ndarray:
+   """Bits for numbers coprime to 30: bit k of byte j stands for 30j + WHEEL_RESIDUES[k]"""
+   size = n // WHEEL_MODULUS + 1
+   bits = np.zeros(size, dtype=np.uint8)
+   base = [p for p in small_primes(math.isqrt(n)) if p > 5]
+   segment_rows = SEGMENT_SIZE // 4
+   planes = np.empty((8, segment_rows), dtype=bool)
+
+   # For every base prime, the 8 (plane, first row) pairs of its multiples p*q with q coprime to 30
+   offsets = []
+   for p in base:
+       pairs = []
+       for q in WHEEL_RESIDUES.tolist():
+           m0 = max(0, -(-(p - q) // WHEEL_MODULUS))
+           value = p * (WHEEL_MODULUS * m0 + q)
+           pairs.append((_WHEEL_INDEX[value % WHEEL_MODULUS], value // WHEEL_MODULUS))
+       offsets.append((p, pairs))
+
+   for lo in range(0, size, segment_rows):
+       hi = min(lo + segment_rows, size)
+       seg = planes[:, :hi - lo]
+       seg[:] = True
+       if lo == 0:
+           seg[0, 0] = False  # 1 is not prime
+       for p, pairs in offsets:
+           if p * p // WHEEL_MODULUS >= hi:
+               break
+           for k, row in pairs:
+               if row < lo:
+                   row += -(-(lo - row) // p) * p
+               seg[k, row - lo::p] = False
+       bits[lo:hi] = np.packbits(seg, axis=0, bitorder='little')[0]
+
+   # Clear slots past n in the final byte
+   last = size - 1
+   for k, r in enumerate(WHEEL_RESIDUES.tolist()):
+       if last * WHEEL_MODULUS + r > n:
+           bits[last] &= ~np.uint8(1 << k)
+   return bits
+
+def prime_bits(n: int, wheel: bool = False) -> SieveBits:
+   """Bit-packed sieve up to n (odd-only, or 2·3·5 wheel)"""
+   n = max(int(n), 1)
+   if wheel:
+       return SieveBits(n, _sieve_wheel(n), 'wheel30')
+   return SieveBits(n, _sieve_odd(n), 'odd')
+
+def primes_up_to(n: int, wheel: bool = False) -> np.ndarray:
+   """All primes <= n as an int64 array"""
+   if n < 2:
+       return np.empty(0, dtype=np.int64)
+   return prime_bits(n, wheel).to_array()
+
+def prime_count(n: int, wheel: bool = False) -> int:
+   """pi(n) by popcount over the packed sieve"""
+   if n < 2:
+       return 0
+   return prime_bits(n, wheel).count()
+
+def iter_prime_segments(lo: int, hi: int, segment_size: int = SEGMENT_SIZE) -> Iterator[np.ndarray]:
+   """Yield the primes in [lo, hi) one segment at a time.
+
+   Memory is bounded by one segment of segment_size odd numbers plus the
+   base primes up to sqrt(hi), independent of how large lo is.
+   """
+   lo = max(int(lo), 2)
+   hi = int(hi)
+   if hi <= lo:
+       return
+   if lo == 2:
+       yield np.array([2], dtype=np.int64)
+       lo = 3
+
+   base = np.array(small_primes(math.isqrt(hi - 1))[1:], dtype=np.int64)
+   segment = np.empty(segment_size, dtype=bool)
+   span = 2 * segment_size
+
+   for a in range(lo | 1, hi, span):
+       b = min(a + span, hi)
+       seg = segment[:(b - a + 1) // 2]  # slot i stands for a + 2i
+       seg[:] = True
+       if a == 1:
+           seg[0] = False
+
+       active = base[:int(np.searchsorted(base, math.isqrt(b - 1), side='right'))]
+       first = np.maximum(active * active, -(-a // active) * active)
+       first += (first % 2 == 0) * active
+       for p, offset in zip(active.tolist(), ((first - a) // 2).tolist()):
+           seg[offset::p] = False
+
+       yield a + 2 * np.flatnonzero(seg).astype(np.int64)
+
+def primes_in_range(lo: int, hi: int) -> np.ndarray:
+   """All primes in [lo, hi) as an int64 array"""
+   parts = list(iter_prime_segments(lo, hi))
+   return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
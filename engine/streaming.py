@@ -0,0 +1,56 @@
+"""
+ProductiveMiner Streaming Helpers
+Long-running computations are written as generators that yield progress
+dictionaries and return their final result. These helpers run such
+generators to completion, rate-limit their progress and encode events as
+NDJSON lines or Server-Sent Events.
+"""
+
+import json
+import time
+from typing import Any, Dict, Generator, Iterator
+
+# Minimum seconds between progress events forwarded to a client
+PROGRESS_INTERVAL = 0.5
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def drain(steps: Generator[Dict[str, Any], None, Any]) -> Any:
+   """Run a progress generator to completion and return its result"""
+   while True:
+       try:
+           next(steps)
+       except StopIteration as stop:
+           return stop.value
+
+def throttle(steps: Generator[Dict[str, Any], None, Any], interval: float = PROGRESS_INTERVAL) -> Generator[Dict[str, Any], None, Any]:
+   """Forward at most one progress event per interval; the result is passed through"""
+   last = 0.0
+   while True:
+       try:
+           progress = next(steps)
+       except StopIteration as stop:
+           return stop.value
+       now = time.time()
+       if now - last >= interval:
+           last = now
+           yield progress
+
+def encode_event(event: Dict[str, Any], media_type: str = NDJSON_MEDIA_TYPE) -> str:
+   """One event as an NDJSON line or a Server-Sent Event"""
+   data = json.dumps(event, default=str)
+   if media_type == SSE_MEDIA_TYPE:
+       return f"event: {event.get('event', 'message')}\ndata: {data}\n\n"
+   return data + "\n"
+
+def with_result(steps: Generator[Dict[str, Any], None, Any]) -> Iterator[Dict[str, Any]]:
+   """Progress events followed by a final {"event": "result"} event carrying the return value"""
+   throttled = throttle(steps)
+   while True:
+       try:
+           progress = next(throttled)
+       except StopIteration as stop:
+           yield {"event": "result", "result": stop.value}
+           return
+       yield {"event": "progress", **progress}
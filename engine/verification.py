@@ -0,0 +1,211 @@
+"""
+ProductiveMiner Result Verification
+Checks claimed results without recomputing them. Each claim carries
+evidence that is far cheaper to check than to find: Goldbach pairs are
+tested with Miller-Rabin, Collatz trajectories are replayed for exactly
+the claimed number of steps, and Riemann zeros are confirmed by a sign
+change of Z(t) around each claimed height. Parts of a result that have no
+such certificate, like the number of seeds covered, are reported as
+unchecked rather than trusted.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from arithmetic import is_prime
+from collatz import replay_trajectory
+from riemann import sign_changes_at
+from sieve import small_primes
+
+# Most items (pairs, seeds, zeros) checked per claim
+VERIFY_MAX_ITEMS = 1000
+# Largest integers accepted, in bits; primality tests grow with the cube of the size
+VERIFY_MAX_BITS = 1024
+# Longest Collatz trajectory replayed
+VERIFY_MAX_STEPS = 100_000
+# Minimality of a Goldbach prime p is checked by testing every smaller prime up to this bound
+VERIFY_MINIMALITY_LIMIT = 1 << 16
+
+class MalformedClaim(Exception):
+   """The claimed result lacks the fields its work type is verified from"""
+
+class NoVerifier(Exception):
+   """The work type has no verification cheaper than recomputing it"""
+
+class Checks:
+   """Tally of the checks made on one claim.
+
+   Only certificate checks (primality, replayed trajectories, sign changes)
+   count as passed; consistency checks on the claim's shape can fail it but
+   prove nothing by passing.
+   """
+
+   def __init__(self):
+       self.passed = 0
+       self.failures: List[str] = []
+       self.unchecked: List[str] = []
+
+   def expect(self, ok: bool, failure: str) -> bool:
+       if ok:
+           self.passed += 1
+       else:
+           self.failures.append(failure)
+       return ok
+
+   def require(self, ok: bool, failure: str) -> bool:
+       if not ok:
+           self.failures.append(failure)
+       return ok
+
+   def skip(self, field: str) -> None:
+       if field not in self.unchecked:
+           self.unchecked.append(field)
+
+def _integer(value: Any, name: str) -> int:
+   if isinstance(value, bool) or not isinstance(value, int):
+       raise MalformedClaim(f"{name} must be an integer")
+   if value.bit_length() > VERIFY_MAX_BITS:
+       raise MalformedClaim(f"{name} exceeds {VERIFY_MAX_BITS} bits")
+   return value
+
+def _items(value: Any, name: str) -> list:
+   if not isinstance(value, list):
+       raise MalformedClaim(f"{name} must be a list")
+   if len(value) > VERIFY_MAX_ITEMS:
+       raise MalformedClaim(f"{name} holds more than {VERIFY_MAX_ITEMS} items")
+   return value
+
+def _check_minimal_goldbach_prime(checks: Checks, n: int, p: int, label: str) -> None:
+   """p is the smallest prime with n - p prime: no smaller prime q has n - q prime"""
+   if p > VERIFY_MINIMALITY_LIMIT:
+       checks.skip(f"{label} minimality")
+       return
+   smaller = next((q for q in small_primes(p - 1) if is_prime(n - q)), None)
+   checks.expect(smaller is None, smaller and f"{label}: {n} = {smaller} + {n - smaller} has a smaller prime than {p}")
+
+def verify_goldbach(result: Dict[str, Any], checks: Checks) -> None:
+   if "verification" in result:
+       # Range mode: the minimal prime of sampled evens and of the one needing the largest
+       verification = result["verification"]
+       claimed = list(_items(verification.get("sample", []), "verification.sample"))
+       if verification.get("largest_minimal_prime", {}).get("n") is not None:
+           largest = verification["largest_minimal_prime"]
+           claimed.append({"n": largest.get("n"), "min_prime": largest.get("p")})
+       checks.require(bool(claimed), "No sampled evens to verify")
+       for item in claimed:
+           n, p = _integer(item.get("n"), "n"), _integer(item.get("min_prime"), "min_prime")
+           if checks.expect(n % 2 == 0 and is_prime(p) and is_prime(n - p), f"{n} = {p} + {n - p} is not a sum of two primes"):
+               _check_minimal_goldbach_prime(checks, n, p, f"{n}")
+       checks.skip("verification.evens_checked")
+       if verification.get("counterexamples"):
+           checks.skip("verification.counterexamples")
+       return
+
+   if "goldbach_pairs" not in result:
+       raise MalformedClaim("Goldbach results need goldbach_pairs or verification")
+   n = _integer(result.get("even_number"), "even_number")
+   checks.require(n >= 4 and n % 2 == 0, f"{n} is not an even number >= 4")
+   pairs = _items(result["goldbach_pairs"], "goldbach_pairs")
+   checks.require(bool(pairs), f"No Goldbach pairs claimed for {n}")
+   primes = []
+   for pair in pairs:
+       if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+           raise MalformedClaim("Each Goldbach pair must be [p, q]")
+       p, q = _integer(pair[0], "p"), _integer(pair[1], "q")
+       if checks.expect(p + q == n and is_prime(p) and is_prime(q), f"{n} = {p} + {q} is not a sum of two primes"):
+           primes.append(p)
+   # Pairs are reported smallest p first, so every prime below the last one must be a claimed pair or fail
+   if primes and max(primes) <= VERIFY_MINIMALITY_LIMIT:
+       claimed = set(primes)
+       missing = next((q for q in small_primes(max(primes)) if q not in claimed and q <= n // 2 and is_prime(n - q)), None)
+       checks.expect(missing is None, missing and f"{n} = {missing} + {n - missing} is missing from the smallest pairs")
+   elif primes:
+       checks.skip("goldbach_pairs minimality")
+
+def verify_collatz(result: Dict[str, Any], checks: Checks) -> None:
+   def replay(seed: int, steps: int, prefix: Optional[list] = None) -> None:
+       if steps > VERIFY_MAX_STEPS:
+           raise MalformedClaim(f"Trajectory of {steps} steps exceeds {VERIFY_MAX_STEPS}")
+       # One step more than claimed tells a longer trajectory from a matching one
+       outcome = replay_trajectory(seed, steps + 1)
+       if not checks.expect(outcome is not None and outcome[0] == steps,
+                            f"{seed} reaches 1 after {outcome[0] if outcome else f'more than {steps + 1}'} steps, not {steps}"):
+           return
+       if prefix:
+           n, expected = seed, []
+           for _ in range(len(prefix)):
+               expected.append(n)
+               n = 3 * n + 1 if n & 1 else n >> 1
+           checks.expect(prefix == expected, f"Sequence of {seed} does not start {prefix}")
+
+   if "verification" in result:
+       # Range mode: replay the seeds claimed as longest trajectory and highest excursion
+       verification = result["verification"]
+       longest = verification.get("longest_trajectory") or {}
+       highest = verification.get("max_excursion") or {}
+       if longest.get("seed") is not None:
+           replay(_integer(longest["seed"], "seed"), _integer(longest.get("steps"), "steps"))
+       if highest.get("seed") is not None:
+           seed = _integer(highest["seed"], "seed")
+           outcome = replay_trajectory(seed, VERIFY_MAX_STEPS)
+           peak = _integer(highest.get("peak"), "peak")
+           if checks.expect(outcome is not None, f"{seed} does not reach 1 within {VERIFY_MAX_STEPS} steps"):
+               checks.expect(outcome[1] == peak, f"Trajectory of {seed} peaks at {outcome[1]}, not {peak}")
+       checks.skip("verification.seeds_verified")
+       return
+
+   if "sequences" not in result:
+       raise MalformedClaim("Collatz results need sequences or verification")
+   sequences = _items(result["sequences"], "sequences")
+   checks.require(bool(sequences), "No Collatz sequences claimed")
+   for sequence in sequences:
+       # A sequence of length L has L - 1 steps down to 1
+       replay(_integer(sequence.get("start"), "start"), _integer(sequence.get("length"), "length") - 1,
+              prefix=sequence.get("sequence"))
+
+def verify_riemann_zeros(result: Dict[str, Any], checks: Checks) -> None:
+   zeros = _items(result.get("zeros"), "zeros")
+   checks.require(bool(zeros), "No zeros claimed")
+   gammas = []
+   for zero in zeros:
+       gamma = zero.get("imaginary") if isinstance(zero, dict) else None
+       if not isinstance(gamma, (int, float)) or not 10.0 <= gamma <= 1e12:
+           raise MalformedClaim("Each zero needs an imaginary part between 10 and 1e12")
+       checks.require(zero.get("real") == 0.5, f"Zero at {gamma} is reported off the critical line")
+       gammas.append(float(gamma))
+   checks.require(gammas == sorted(set(gammas)), "Zeros are not distinct and increasing")
+   t_start, t_end = result.get("t_start"), result.get("t_end")
+   if gammas and isinstance(t_start, (int, float)) and isinstance(t_end, (int, float)):
+       checks.require(t_start <= gammas[0] and gammas[-1] <= t_end, f"Zeros lie outside [{t_start}, {t_end}]")
+   if gammas:
+       for gamma, ok in zip(gammas, sign_changes_at(gammas)):
+           checks.expect(bool(ok), f"Z(t) does not change sign at t={gamma}")
+   checks.skip("zeros_found")
+   checks.skip("gram_law_violations")
+
+VERIFIERS: Dict[str, Callable[[Dict[str, Any], Checks], None]] = {
+   "goldbach-conjecture": verify_goldbach,
+   "collatz-conjecture": verify_collatz,
+   "riemann-zeros": verify_riemann_zeros
+}
+
+def verify_result(work_type: str, result: Dict[str, Any]) -> Dict[str, Any]:
+   """Verdict on a claimed result: valid when no check failed and at least one certificate was checked"""
+   verifier = VERIFIERS.get(work_type)
+   if verifier is None:
+       raise NoVerifier(f"No verification for {work_type}; supported: {', '.join(sorted(VERIFIERS))}")
+   started = time.time()
+   checks = Checks()
+   try:
+       verifier(result, checks)
+   except (AttributeError, KeyError, TypeError) as e:
+       raise MalformedClaim(f"Malformed {work_type} result: {e}")
+   return {
+       "work_type": work_type,
+       "valid": not checks.failures and checks.passed > 0,
+       "checks_passed": checks.passed,
+       "failures": checks.failures[:10],
+       "checks_failed": len(checks.failures),
+       "unchecked": checks.unchecked,
+       "verification_time": time.time() - started
+   }
@@ -0,0 +1,220 @@
+"""
+ProductiveMiner Worker Pool
+Runs CPU-bound work type handlers in separate processes so the
+FastAPI event loop stays responsive while computations are running
+"""
+
+import asyncio
+import atexit
+import inspect
+import logging
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class ComputationTimeout(Exception):
+   """Raised when a computation exceeds its time budget"""
+
+class WorkerCrashed(Exception):
+   """Raised when a worker process dies while running a computation"""
+
+def _worker_main(conn) -> None:
+   """Worker process loop: receive (fn, args), send back the outcome"""
+   if hasattr(os, "setpgrp"):
+       # Own process group, so killing the worker also stops any processes it started
+       os.setpgrp()
+   conn.send(("ready", None))
+   while True:
+       try:
+           task = conn.recv()
+       except (EOFError, KeyboardInterrupt):
+           break
+       if task is None:
+           break
+
+       fn, args = task
+       try:
+           result = fn(*args)
+           if inspect.isgenerator(result):
+               # Streaming task: relay every item, then signal the end
+               for item in result:
+                   conn.send(("item", item))
+               result = None
+           message = ("result", result)
+       except Exception as exc:
+           message = ("error", exc)
+
+       try:
+           conn.send(message)
+       except Exception as exc:
+           # Result or exception was not picklable
+           conn.send(("error", RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+class _Worker:
+   def __init__(self, ctx):
+       self.conn, child_conn = ctx.Pipe(duplex=True)
+       # Not daemonic, so handlers may start process pools of their own
+       self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=False)
+       self.process.start()
+       child_conn.close()
+       self.ready = False
+
+   def wait_ready(self) -> None:
+       """Block until the worker has finished importing and can accept work"""
+       if not self.ready:
+           self.conn.recv()
+           self.ready = True
+
+   def kill(self) -> None:
+       if self.process.is_alive():
+           try:
+               os.killpg(self.process.pid, signal.SIGKILL)
+           except (AttributeError, OSError):
+               self.process.kill()
+       self.process.join(timeout=1)
+       self.conn.close()
+
+   def stop(self) -> None:
+       try:
+           self.conn.send(None)
+       except (OSError, ValueError):
+           pass
+       self.process.join(timeout=1)
+       self.kill()
+
+class ComputePool:
+   """Fixed-size pool of worker processes with per-task timeouts"""
+
+   def __init__(self, size: int, timeout: Optional[float] = None):
+       self.size = max(1, int(size))
+       self.timeout = timeout
+       self._ctx = multiprocessing.get_context(
+           "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+       )
+       self._workers = []
+       self._idle: Optional[asyncio.Queue] = None
+       self._waiters = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="pool-wait")
+       self.completed = 0
+       self.failed = 0
+       self.timed_out = 0
+
+   def start(self) -> None:
+       # Non-daemonic workers would otherwise be joined, not stopped, at interpreter exit
+       atexit.register(self.shutdown)
+       self._idle = asyncio.Queue()
+       for _ in range(self.size):
+           worker = _Worker(self._ctx)
+           self._workers.append(worker)
+           self._idle.put_nowait(worker)
+       logger.info(f"Started compute pool with {self.size} workers ({self._ctx.get_start_method()})")
+
+   def shutdown(self) -> None:
+       for worker in self._workers:
+           worker.stop()
+       self._workers = []
+       self._waiters.shutdown(wait=False)
+
+   def _replace(self, worker: _Worker) -> _Worker:
+       worker.kill()
+       replacement = _Worker(self._ctx)
+       self._workers[self._workers.index(worker)] = replacement
+       return replacement
+
+   @property
+   def busy(self) -> int:
+       return self.size - (self._idle.qsize() if self._idle else 0)
+
+   @property
+   def pids(self) -> List[int]:
+       return [worker.process.pid for worker in self._workers if worker.process.pid is not None]
+
+   def stats(self) -> Dict[str, Any]:
+       return {
+           "size": self.size,
+           "busy": self.busy,
+           "completed": self.completed,
+           "failed": self.failed,
+           "timed_out": self.timed_out
+       }
+
+   async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+       """Run fn(*args) in a worker process and return its result"""
+       if timeout is None:
+           timeout = self.timeout
+
+       loop = asyncio.get_running_loop()
+       worker = await self._idle.get()
+       try:
+           # Startup time of a freshly spawned worker does not count against the timeout
+           await loop.run_in_executor(self._waiters, worker.wait_ready)
+           worker.conn.send((fn, args))
+           ready = await loop.run_in_executor(self._waiters, worker.conn.poll, timeout)
+           if not ready:
+               self.timed_out += 1
+               worker = self._replace(worker)
+               raise ComputationTimeout(f"Computation exceeded {timeout}s")
+
+           try:
+               kind, payload = worker.conn.recv()
+           except (EOFError, OSError):
+               self.failed += 1
+               worker = self._replace(worker)
+               raise WorkerCrashed("Worker process exited during computation")
+       except asyncio.CancelledError:
+           # Caller went away; the worker may still be busy, so recycle it
+           worker = self._replace(worker)
+           raise
+       finally:
+           self._idle.put_nowait(worker)
+
+       if kind == "error":
+           self.failed += 1
+           raise payload
+       self.completed += 1
+       return payload
+
+   async def stream(self, fn: Callable, *args, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+       """Run a generator function fn(*args) in a worker process and yield its items.
+
+       The timeout bounds the whole stream. If the consumer stops early (client
+       disconnect or cancel) the worker is killed and replaced, freeing the slot.
+       """
+       if timeout is None:
+           timeout = self.timeout
+
+       loop = asyncio.get_running_loop()
+       worker = await self._idle.get()
+       finished = False
+       try:
+           await loop.run_in_executor(self._waiters, worker.wait_ready)
+           deadline = loop.time() + timeout if timeout else None
+           worker.conn.send((fn, args))
+           while True:
+               remaining = max(0.0, deadline - loop.time()) if deadline else None
+               ready = await loop.run_in_executor(self._waiters, worker.conn.poll, remaining)
+               if not ready:
+                   self.timed_out += 1
+                   raise ComputationTimeout(f"Computation exceeded {timeout}s")
+               try:
+                   kind, payload = worker.conn.recv()
+               except (EOFError, OSError):
+                   self.failed += 1
+                   raise WorkerCrashed("Worker process exited during computation")
+
+               if kind == "item":
+                   yield payload
+                   continue
+               finished = True
+               if kind == "error":
+                   self.failed += 1
+                   raise payload
+               self.completed += 1
+               return
+       finally:
+           if not finished:
+               worker = self._replace(worker)
+           self._idle.put_nowait(worker)